@@ -8,10 +8,9 @@ import re
 import time
 import threading
 import math
-import gzip
 import queue
-from statistics import geometric_mean
-from statistics import stdev
+import json
+import contextlib
 from datetime import datetime
 from datetime import timedelta
 
@@ -19,9 +18,22 @@ from datetime import timedelta
 # which emulators should be tested, please create sublists per mechanisms
 emulators = [["freertos_list", "freertos_boi"]]
 
+# further axes of the job matrix, every axis maps labels to arguments appended
+# to the command line and environment variables, e.g. {"tick": {"1k":
+# {"args": ["1000"]}, "10k": {"args": ["10000"], "env": {"TICK": "10000"}}}}.
+# Every emulator runs with every combination of labels and is named
+# <emulator>@<axis>=<label>... in logs and statistics
+emulation_matrix = {}
+
 # how often should each taskset be tested
 runs_emulation_per_set = 10
 
+# runs per emulator process by taskset size, e.g. {"5": 10, "10": 5}, to save
+# process startup for small tasksets. The output is split into one log per
+# run after every line starting with log_run_delimiter, which has to be set.
+# Sizes not listed are emulated with one run per process
+runs_per_process = {}
+
 # how many threads should be used for emulation
 number_of_threads_emulation = 10
 
@@ -31,9 +43,102 @@ number_of_threads_stats = 100
 # compress logs on creation / read compressed logs on stats generation
 log_compress = True
 
+# append logs to one archive per taskset size and emulator, consisting of
+# independently compressed members (log/<size>/<emulator>.archive) and an
+# index of their offsets (.archive.idx), instead of single files
+log_archive = False
+
+# parse uncompressed logs of at least this many bytes in parallel worker
+# processes, the memory-mapped log is split into ranges at line boundaries
+log_parse_min_size = 67108864
+
+# number of worker processes for parsing, 0 for the number of cpus
+log_parse_processes = 0
+
 # logging prefix for timer values
 log_prefix = "TIME"
 
+# prefix of the line the emulator prints at the end of each run (iteration)
+log_run_delimiter = ""
+
+# negative timer values are caused by a wraparound of the timer, "add" adds
+# timer_wrap_modulus, "drop" ignores these values and "none" keeps them
+timer_wrap_mode = "add"
+timer_wrap_modulus = 1000000000
+
+# ignore timer values above this value after wraparound handling, 0 disables
+timer_max_value = 0
+
+# further metrics printed by the emulator, extracted in the same pass as the
+# timer values of log_prefix. Every metric has the line prefix, the parse
+# rule ("int" or "float") and the wraparound rule ("add", "drop", "none", or
+# "timer" for the rules of timer values above), e.g.
+# {"delete": {"prefix": "DEL", "parse": "int", "wrap": "timer"}}
+log_metrics = {}
+
+# filter outliers of every run, "mad" uses the median absolute deviation,
+# "iqr" the interquartile range and "" disables filtering, filtered values
+# are written next to the raw values
+stats_outlier_filter = ""
+
+# threshold for outliers, robust z-score for "mad" (typically 3.5) and
+# multiple of the interquartile range for "iqr" (typically 1.5)
+stats_outlier_threshold = 3.5
+
+# remove warm-up at the beginning of every run by MSER truncation, "mser" on
+# single values, "mser5" on batches of five values or "" to disable. The
+# steady state statistics (suffix _steady) and the number of removed inserts
+# (warmup) are added to the raw values
+stats_warmup_filter = ""
+
+# maximum fraction of a run that may be removed as warm-up
+stats_warmup_max_fraction = 0.5
+
+# export insert time against insert index of every run to
+# log/<size>/<tasksetfile>-<emulator>-<run>.series.dat, downsampled by
+# "lttb" (largest triangle three buckets) or "minmax" (min, mean and max per
+# window), "" to disable
+stats_series = ""
+
+# number of points (lttb) or windows (minmax) of exported series
+stats_series_points = 1000
+
+# export a logarithmically binned histogram and the empirical distribution
+# function of insert times per emulator and taskset size, merged from the
+# binned counts of all runs
+stats_distribution = False
+
+# bins per power of ten of the histogram
+stats_distribution_bins = 50
+
+# compare the inserts of every emulator with the first one of its sublist,
+# aligned by insert index of the same taskset and run. Quantiles and the
+# course of the speedup per taskset size are written to paired.csv/.dat,
+# the aligned series of every run to <tasksetfile>-<emulator>-<run>.paired.dat
+stats_paired = False
+
+# maximum number of windows of the aligned series
+stats_paired_windows = 200
+
+# append aggregates of every stats run to a SQLite database, tagged with
+# time, host and emulator hashes, for emulate.py compare
+stats_history = False
+stats_history_file = "log/history.sqlite"
+
+# field, significance level and minimum relative change for compare
+compare_field = "time_perinsert_mean"
+compare_alpha = 0.05
+compare_min_change = 0.02
+
+# quick preview (emulate.py stats --preview): tasksets and runs per taskset
+# size chosen by a seeded random generator, inserts sampled per log by
+# reservoir sampling and maximum uncompressed bytes read per log
+preview_tasksets = 5
+preview_runs = 2
+preview_samples = 1000
+preview_max_bytes = 1048576
+preview_seed = 1
+
 # create statistics per taskset
 stats_per_set_csv = False
 stats_per_set_dat = False
@@ -54,6 +159,798 @@ stats_overall_dat = True
 stats_overall_csv_full = False
 stats_overall_dat_full = False
 
+# keep the data per run of all taskset sizes for the result of stats (library
+# use), otherwise it is released once the files of its size are written
+stats_keep_data = False
+
+# fit per-insert time against taskset size with the models constant, log n,
+# n and n log n and estimate crossover sizes between the emulators of each
+# sublist, written to scaling.csv/.dat and scaling-<emulator>.dat
+stats_scaling = False
+
+# largest taskset size for extrapolation of fits and crossovers
+stats_scaling_max_size = 100000
+
+# number of points of the exported fit curves
+stats_scaling_points = 200
+
+# write a json report with wall and cpu time per phase to the log folder
+profile_report = False
+
+# dump cProfile data of one phase to the log folder, one of discovery,
+# dispatch, emulation, decompression, parsing, aggregation, output
+profile_cprofile_phase = ""
+
+# reference job for calibration and control jobs, empty taskset means first
+# taskset of largest size, empty emulator means first configured emulator
+calibration_taskset = ""
+calibration_emulator = ""
+
+# how many runs per concurrency level should be used for calibration
+calibration_runs = 10
+
+# maximum accepted relative shift of per-insert time against single job
+calibration_max_shift = 0.05
+
+# adapt number of emulation threads to load and control job timing, the
+# maximum is taken from log/calibration.json if available
+emulation_adaptive = False
+
+# run control job after this number of emulation jobs
+emulation_control_interval = 50
+
+# number of control jobs averaged before the drift changes the threads
+emulation_control_samples = 3
+
+# reduce emulation threads when load average per cpu of other processes,
+# i.e. without the running emulations, exceeds this value
+emulation_max_load = 1.0
+
+# planning (emulate.py plan <seconds>): cost in seconds of adding a taskset
+# and minimum runs per taskset, the plan is written to plan_file
+plan_taskset_cost = 0.0
+plan_min_runs = 2
+plan_file = "log/plan.json"
+
+# emulate and gather only the number of tasksets and runs per taskset size
+# given in plan_file
+emulation_plan = False
+
+# store cpu time, context switches, page faults and max rss of every
+# emulation next to its logfile (*.rusage.json)
+log_rusage = True
+
+# add resource usage of runs as columns to statistics per taskset
+stats_per_set_rusage = False
+
+# skip runs that were disturbed, i.e. exceeded one of the limits below
+stats_exclude_disturbed = False
+disturbed_max_ctxsw_involuntary = 100
+disturbed_max_faults_major = 0
+disturbed_max_migrations = 10
+
+# cache of taskset directory listing, ids, hashes and number of tasks
+taskset_manifest = "log/manifest.json"
+
+# read every taskset file again when loading the manifest, otherwise only
+# files whose size or modification time changed are read
+taskset_manifest_verify = False
+
+# columns of period and wcet in the task lines of taskset files, used for
+# the taskset properties tasks, period_min, period_max, period_range,
+# periods_distinct and utilization stored in the manifest
+taskset_period_column = 1
+taskset_wcet_column = 2
+
+# write statistics grouped by this taskset property to groups-<property>
+# .csv/.dat, "" to disable
+stats_group_by = ""
+
+# maximum number of groups, properties with more distinct values are split
+# into groups of about equal numbers of tasksets
+stats_group_bins = 5
+
+# use only tasksets whose properties are within the given ranges for stats,
+# e.g. {"utilization": [0.5, 0.8], "tasks": [10, 10]}
+stats_filter = {}
+
+# store results in a cache keyed by hashes of taskset and emulator binary,
+# arguments and run, jobs with valid results in the cache are not run again
+result_cache = False
+result_cache_dir = "log/cache"
+
+# serve live metrics of run in Prometheus text format on this local port,
+# 0 disables the endpoint
+metrics_port = 0
+
+# write live metrics of run to this Prometheus textfile, empty disables
+metrics_textfile = ""
+
+# interval in seconds for measuring disk usage of log folder
+metrics_disk_interval = 60
+
+# stage uncompressed emulator output in a RAM directory (e.g. /dev/shm), a
+# low priority background thread compresses and moves it to log afterwards,
+# "" to write directly to log
+log_staging_dir = ""
+
+# maximum bytes of staged logs, new jobs wait until the flush caught up
+log_staging_budget = 1073741824
+
+# minimum available memory in bytes, new jobs wait if less is available
+log_staging_min_free = 536870912
+
+# names of all settings above, defaults of a Configuration
+config_names = [
+    name for name, value in list(globals().items())
+    if name.startswith("_") == False and isinstance(value, (bool, int, float,
+                                                            str, list, dict))
+]
+
+### configuration objects
+configuration_lock = threading.RLock()
+
+
+# raised instead of exiting, message is printed by the command line interface
+class EmulationError(Exception):
+    pass
+
+
+# settings for library use, unset values default to module level settings
+class Configuration:
+
+    def __init__(self, **settings):
+        import copy
+        for name in config_names:
+            setattr(self, name, copy.deepcopy(globals()[name]))
+        for name, value in settings.items():
+            if name not in config_names:
+                raise TypeError("unknown setting " + name)
+            setattr(self, name, value)
+
+
+# apply configuration to module level settings while running a command
+@contextlib.contextmanager
+def useConfiguration(config):
+    import multiprocessing
+    # worker processes for parsing import the main module of the caller,
+    # commands at its top level must not run again there
+    if getattr(multiprocessing.current_process(), "_inheriting",
+               False) == True:
+        raise EmulationError("Error running command in worker process, " +
+                             "scripts using emulate need a main guard")
+    if config == None:
+        yield
+        return
+
+    with configuration_lock:
+        saved = {}
+        for name in config_names:
+            saved[name] = globals()[name]
+            globals()[name] = getattr(config, name)
+        try:
+            yield
+        finally:
+            for name in config_names:
+                globals()[name] = saved[name]
+
+
+# run function in thread and keep exceptions for the dispatching thread
+def catchingThread(errors, target, *args):
+    try:
+        target(*args)
+    except Exception as error:
+        errors.append(error)
+
+
+### profiling
+profile_lock = threading.Lock()
+profile_phases = {}
+profile_workers = {}
+profile_cprofile = {}
+profile_cprofile_lock = threading.Lock()
+
+
+# reset collected profiling data
+def profileReset():
+    profile_lock.acquire()
+    profile_phases.clear()
+    profile_workers.clear()
+    profile_cprofile.clear()
+    profile_lock.release()
+
+
+# measure wall and cpu time of a phase, optionally with cProfile
+@contextlib.contextmanager
+def profilePhase(phase):
+    if profile_report == False and profile_cprofile_phase != phase:
+        yield
+        return
+
+    profiler = None
+    if profile_cprofile_phase == phase:
+        # only one profiler may be active at a time (Python 3.12+), calls of
+        # the phase running meanwhile in other threads are not profiled
+        if profile_cprofile_lock.acquire(blocking=False) == True:
+            if "profiler" not in profile_cprofile:
+                import cProfile
+                profile_cprofile["profiler"] = cProfile.Profile()
+                profile_cprofile["calls"] = 0
+            profiler = profile_cprofile["profiler"]
+            profile_cprofile["calls"] += 1
+            profiler.enable()
+
+    walltime = time.perf_counter()
+    cputime = time.thread_time()
+    try:
+        yield
+    finally:
+        cputime = time.thread_time() - cputime
+        walltime = time.perf_counter() - walltime
+        if profiler != None:
+            profiler.disable()
+            profile_cprofile_lock.release()
+        profile_lock.acquire()
+        if phase not in profile_phases:
+            profile_phases[phase] = {
+                "calls": 0,
+                "time_wall": 0.0,
+                "time_cpu": 0.0
+            }
+        profile_phases[phase]["calls"] += 1
+        profile_phases[phase]["time_wall"] += walltime
+        profile_phases[phase]["time_cpu"] += cputime
+        profile_lock.release()
+
+
+# add busy and cpu time of a job to the worker slot that executed it
+def profileWorker(slot, busytime, cputime):
+    if profile_report == False:
+        return
+
+    profile_lock.acquire()
+    if slot not in profile_workers:
+        profile_workers[slot] = {"jobs": 0, "time_busy": 0.0, "time_cpu": 0.0}
+    profile_workers[slot]["jobs"] += 1
+    profile_workers[slot]["time_busy"] += busytime
+    profile_workers[slot]["time_cpu"] += cputime
+    profile_lock.release()
+
+
+# write profiling report and cProfile dump to log folder
+def profileWrite(command, walltime, slots):
+    import resource
+    if profile_report == False and profile_cprofile_phase == "":
+        return
+
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    if profile_report == True:
+        usage_self = resource.getrusage(resource.RUSAGE_SELF)
+        usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        busytime = 0.0
+        workers = {}
+        for slot in sorted(profile_workers):
+            worker = dict(profile_workers[slot])
+            busytime += worker["time_busy"]
+            worker["utilization"] = \
+                worker["time_busy"] / walltime if walltime > 0 else 0.0
+            workers["slot-" + str(slot)] = worker
+        report = {
+            "command": command,
+            "timestamp": timestamp,
+            "time_wall": walltime,
+            "slots": slots,
+            "slot_utilization":
+            busytime / (slots * walltime) if walltime > 0 else 0.0,
+            "phases": profile_phases,
+            "workers": workers,
+            "self": {
+                "time_user": usage_self.ru_utime,
+                "time_system": usage_self.ru_stime,
+                "maxrss_kb": usage_self.ru_maxrss
+            },
+            "children": {
+                "time_user": usage_children.ru_utime,
+                "time_system": usage_children.ru_stime,
+                "maxrss_kb": usage_children.ru_maxrss
+            }
+        }
+        reportname = "./log/profile-" + command + "-" + timestamp + ".json"
+        with open(reportname, "w") as reportfile:
+            json.dump(report, reportfile, indent=2, sort_keys=True)
+        print("\nProfiling report written to " + reportname)
+
+    if profile_cprofile_phase != "" and "profiler" in profile_cprofile:
+        import pstats
+        profilestats = pstats.Stats(profile_cprofile["profiler"])
+        dumpname = "./log/profile-" + command + "-" + \
+            profile_cprofile_phase + "-" + timestamp + ".prof"
+        profilestats.dump_stats(dumpname)
+        print("cProfile data of phase " + profile_cprofile_phase + " (" +
+              str(profile_cprofile["calls"]) + " of " +
+              str(profile_phases[profile_cprofile_phase]["calls"]) +
+              " calls) written to " + dumpname)
+
+
+### live metrics
+metrics_lock = threading.Lock()
+metrics_state = {}
+
+
+# start collecting live metrics, endpoint and disk usage thread
+def metricsStart(jobstotal, slots):
+    if metrics_port == 0 and metrics_textfile == "":
+        return
+
+    metrics_lock.acquire()
+    metrics_state.clear()
+    metrics_state.update({
+        "starttime": time.time(),
+        "jobstotal": jobstotal,
+        "slots": slots,
+        "jobs": {},
+        "time_busy": 0.0,
+        "time_jobs": 0.0,
+        "jobs_timed": 0,
+        "log_bytes": 0,
+        "textfile_written": 0.0,
+        "stop": threading.Event(),
+        "server": None
+    })
+    metrics_lock.release()
+
+    diskthread = threading.Thread(target=metricsDiskThread, daemon=True)
+    diskthread.start()
+
+    if metrics_port != 0:
+        import http.server
+
+        class MetricsHandler(http.server.BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                content = metricsText().encode()
+                self.send_response(200)
+                self.send_header("Content-Type",
+                                 "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", metrics_port),
+                                                 MetricsHandler)
+        server.daemon_threads = True
+        metrics_state["server"] = server
+        serverthread = threading.Thread(target=server.serve_forever,
+                                        daemon=True)
+        serverthread.start()
+        print("Serving metrics on http://127.0.0.1:" + str(metrics_port) +
+              "/metrics\n")
+
+
+# stop live metrics and write final textfile
+def metricsStop():
+    if len(metrics_state) == 0:
+        return
+
+    metrics_state["stop"].set()
+    metricsDiskUsage()
+    metricsWriteTextfile(True)
+    if metrics_state["server"] != None:
+        metrics_state["server"].shutdown()
+        metrics_state["server"].server_close()
+    metrics_state.clear()
+
+
+# change job counter of emulator and taskset size
+def metricsCount(emulator, tasksetsize, state, change):
+    if len(metrics_state) == 0:
+        return
+
+    metrics_lock.acquire()
+    key = (emulator, tasksetsize)
+    if key not in metrics_state["jobs"]:
+        metrics_state["jobs"][key] = {
+            "done": 0,
+            "failed": 0,
+            "running": 0,
+            "reused": 0
+        }
+    metrics_state["jobs"][key][state] += change
+    metrics_lock.release()
+
+
+# record started job
+def metricsJobStarted(emulator, tasksetsize):
+    metricsCount(emulator, tasksetsize, "running", 1)
+
+
+# record finished job
+def metricsJobFinished(emulator, tasksetsize, duration, failed):
+    if len(metrics_state) == 0:
+        return
+
+    metricsCount(emulator, tasksetsize, "running", -1)
+    metricsCount(emulator, tasksetsize, "failed" if failed else "done", 1)
+    metrics_lock.acquire()
+    metrics_state["time_busy"] += duration
+    if failed == False:
+        metrics_state["time_jobs"] += duration
+        metrics_state["jobs_timed"] += 1
+    metrics_lock.release()
+    metricsWriteTextfile(False)
+
+
+# record job reused from result cache
+def metricsJobReused(emulator, tasksetsize):
+    metricsCount(emulator, tasksetsize, "reused", 1)
+
+
+# record current number of emulation slots
+def metricsSlots(slots):
+    if len(metrics_state) == 0:
+        return
+
+    metrics_state["slots"] = slots
+
+
+# measure disk usage of log folder
+def metricsDiskUsage():
+    logbytes = 0
+    for logpath, logdirs, logfiles in os.walk("log"):
+        for logfile in logfiles:
+            try:
+                logbytes += os.lstat(logpath + "/" + logfile).st_blocks * 512
+            except:
+                pass
+    metrics_state["log_bytes"] = logbytes
+
+
+# thread measuring disk usage of log folder periodically
+def metricsDiskThread():
+    stop = metrics_state["stop"]
+    while stop.is_set() == False:
+        metricsDiskUsage()
+        stop.wait(metrics_disk_interval)
+
+
+# live metrics in Prometheus text format
+def metricsText():
+    metrics_lock.acquire()
+    elapsed = max(time.time() - metrics_state["starttime"], 0.001)
+    finished = 0
+    running = 0
+    lines = []
+    lines.append("# HELP rtmct_jobs Emulation jobs by state.")
+    lines.append("# TYPE rtmct_jobs gauge")
+    for emulator, tasksetsize in sorted(metrics_state["jobs"]):
+        jobs = metrics_state["jobs"][(emulator, tasksetsize)]
+        finished += jobs["done"] + jobs["failed"] + jobs["reused"]
+        running += jobs["running"]
+        for state in ["done", "failed", "running", "reused"]:
+            lines.append("rtmct_jobs{emulator=\"" + emulator + "\",size=\"" +
+                         tasksetsize + "\",state=\"" + state + "\"} " +
+                         str(jobs[state]))
+
+    jobspersecond = finished / elapsed
+    if metrics_state["jobs_timed"] > 0:
+        jobduration = metrics_state["time_jobs"] / metrics_state["jobs_timed"]
+    else:
+        jobduration = 0.0
+    if jobspersecond > 0:
+        eta = (metrics_state["jobstotal"] - finished) / jobspersecond
+    else:
+        eta = 0.0
+    values = [
+        ["jobs_total", "Planned emulation jobs.", metrics_state["jobstotal"]],
+        ["jobs_finished", "Finished emulation jobs.", finished],
+        ["jobs_per_second", "Finished jobs per second.", jobspersecond],
+        [
+            "job_duration_seconds_mean", "Mean duration of emulation jobs.",
+            jobduration
+        ], ["slots", "Number of emulation slots.", metrics_state["slots"]],
+        ["slots_busy", "Number of busy emulation slots.", running],
+        [
+            "slot_utilization", "Busy time of slots since start.",
+            metrics_state["time_busy"] / (elapsed * metrics_state["slots"])
+        ], ["eta_seconds", "Estimated time until all jobs are finished.", eta],
+        ["elapsed_seconds", "Time since start of run.", elapsed],
+        [
+            "log_disk_bytes", "Disk space used by log folder.",
+            metrics_state["log_bytes"]
+        ]
+    ]
+    metrics_lock.release()
+
+    for name, description, value in values:
+        lines.append("# HELP rtmct_" + name + " " + description)
+        lines.append("# TYPE rtmct_" + name + " gauge")
+        lines.append("rtmct_" + name + " " + str(value))
+
+    return "\n".join(lines) + "\n"
+
+
+# write live metrics to textfile, at most once per second unless forced
+def metricsWriteTextfile(force):
+    if metrics_textfile == "":
+        return
+    if force == False and \
+        time.time() - metrics_state["textfile_written"] < 1:
+        return
+
+    metrics_state["textfile_written"] = time.time()
+    text = metricsText()
+    textfilename = metrics_textfile + "." + str(threading.get_ident())
+    with open(textfilename, "w") as textfile:
+        textfile.write(text)
+    os.replace(textfilename, metrics_textfile)
+
+
+### log staging
+staging_lock = threading.Lock()
+staging_state = {}
+
+
+# create staging directory and start background flush thread
+def stagingStart():
+    if log_staging_dir == "":
+        return
+
+    stagingpath = os.path.join(log_staging_dir,
+                               "rtmct-staging-" + str(os.getpid()))
+    os.makedirs(stagingpath, exist_ok=True)
+    staging_state.clear()
+    staging_state.update({
+        "path": stagingpath,
+        "queue": queue.Queue(),
+        "count": 0,
+        "pending": 0,
+        "thread": threading.Thread(target=stagingFlushThread)
+    })
+    staging_state["thread"].start()
+    print("Staging logs in " + stagingpath + "\n")
+
+
+# wait for pending flushes and remove staging directory
+def stagingStop():
+    if len(staging_state) == 0:
+        return
+
+    staging_state["queue"].put(None)
+    staging_state["thread"].join()
+    try:
+        os.rmdir(staging_state["path"])
+    except:
+        print("Staging directory " + staging_state["path"] + " not empty")
+    staging_state.clear()
+
+
+# filename of staged, uncompressed output of a job
+def stagingFilename():
+    staging_lock.acquire()
+    staging_state["count"] += 1
+    stagingfilename = os.path.join(staging_state["path"],
+                                   str(staging_state["count"]) + ".log")
+    staging_lock.release()
+    return stagingfilename
+
+
+# bytes of running and not yet flushed jobs
+def stagingUsage():
+    usage = 0
+    for entry in os.scandir(staging_state["path"]):
+        try:
+            usage += entry.stat().st_size
+        except:
+            pass
+    return usage
+
+
+# available memory in bytes, None if unknown
+def memoryAvailable():
+    try:
+        with open("/proc/meminfo", "r") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except:
+        pass
+    return None
+
+
+# backpressure, wait until budget and memory allow a new job
+def stagingWait():
+    if len(staging_state) == 0:
+        return
+
+    waiting = False
+    while staging_state["pending"] > 0:
+        available = memoryAvailable()
+        if stagingUsage() < log_staging_budget and \
+            (available == None or available >= log_staging_min_free):
+            break
+        if waiting == False:
+            print("Staging budget exhausted, waiting for flush")
+            waiting = True
+        time.sleep(0.1)
+
+
+# queue staged log for compression and move to log folder
+def stagingFlush(stagingfilename, logfilename, cachekey, emulator,
+                 tasksetfilename, run):
+    staging_lock.acquire()
+    staging_state["pending"] += 1
+    staging_lock.release()
+    staging_state["queue"].put((stagingfilename, logfilename, cachekey,
+                                emulator, tasksetfilename, run))
+
+
+# compress and move staged logs with lowest priority
+def stagingFlushThread():
+    import gzip
+    import shutil
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except:
+        pass
+
+    while True:
+        item = staging_state["queue"].get()
+        if item == None:
+            break
+        stagingfilename, logfilename, cachekey, emulator, tasksetfilename, \
+            run = item
+        try:
+            if os.path.lexists(logfilename):
+                os.remove(logfilename)
+            with profilePhase("output"):
+                with open(stagingfilename, "rb") as stagingfile:
+                    if logfilename.endswith(".gz"):
+                        with gzip.open(logfilename + ".tmp",
+                                       "wb",
+                                       compresslevel=6) as logfile:
+                            shutil.copyfileobj(stagingfile, logfile)
+                    else:
+                        with open(logfilename + ".tmp", "wb") as logfile:
+                            shutil.copyfileobj(stagingfile, logfile)
+                os.replace(logfilename + ".tmp", logfilename)
+            if cachekey != None:
+                storeResult(cachekey, logfilename, emulator, tasksetfilename,
+                            run)
+            if log_archive == True:
+                archiveAppend(logfilename, emulator, tasksetfilename, run,
+                              cachekey)
+        except:
+            print("Error flushing staged log " + stagingfilename + " to " +
+                  logfilename)
+        try:
+            os.remove(stagingfilename)
+        except:
+            pass
+        staging_lock.acquire()
+        staging_state["pending"] -= 1
+        staging_lock.release()
+
+
+### parallel parsing
+parse_lock = threading.Lock()
+parse_state = {}
+
+
+# pool of worker processes for parsing, started on first use
+def parsePool():
+    import concurrent.futures
+    import multiprocessing
+    parse_lock.acquire()
+    if "pool" not in parse_state:
+        # spawned workers, as forking a process with running threads can
+        # copy locks held by other threads
+        parse_state["pool"] = concurrent.futures.ProcessPoolExecutor(
+            max_workers=parseProcesses(),
+            mp_context=multiprocessing.get_context("spawn"))
+    pool = parse_state["pool"]
+    parse_lock.release()
+
+    return pool
+
+
+# stop worker processes for parsing
+def parseStop():
+    parse_lock.acquire()
+    pool = parse_state.pop("pool", None)
+    parse_state.pop("broken", None)
+    parse_lock.release()
+    if pool != None:
+        pool.shutdown()
+
+
+# number of worker processes for parsing
+def parseProcesses():
+    if log_parse_processes > 0:
+        return log_parse_processes
+
+    return os.cpu_count() or 1
+
+
+# split memory-mapped log into about count byte ranges at line boundaries
+def logRanges(logmap, count):
+    ranges = []
+    start = 0
+    for i in range(1, count + 1):
+        end = len(logmap) * i // count
+        if end < start:
+            continue
+        if i < count:
+            newline = logmap.find(b"\n", end - 1)
+            if newline == -1:
+                end = len(logmap)
+            else:
+                end = newline + 1
+        if end > start:
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+# parse byte range of uncompressed log, runs in worker process
+def parseLogRange(logfilename, start, end, config):
+    import mmap
+    with useConfiguration(config):
+        with open(logfilename, "rb") as logfile:
+            with mmap.mmap(logfile.fileno(), 0,
+                           access=mmap.ACCESS_READ) as logmap:
+                loglines = logmap[start:end].decode().split("\n")
+
+        return parseLog(loglines)
+
+
+# parse uncompressed log in ranges by worker processes, the values of the
+# ranges are joined in order and are the same as of parseLog. None if the
+# workers failed, e.g. a script importing emulate without main guard or a
+# worker killed by the OOM killer, the log is then parsed serially
+def parseLogParallel(logfilename):
+    import concurrent.futures.process
+    import mmap
+    if parse_state.get("broken") == True:
+        return None
+    with open(logfilename, "rb") as logfile:
+        with mmap.mmap(logfile.fileno(), 0, access=mmap.ACCESS_READ) as logmap:
+            ranges = logRanges(logmap, parseProcesses())
+
+    config = Configuration()
+    inserttimes = []
+    metricvalues = {}
+    for metric in log_metrics:
+        metricvalues[metric] = []
+    with profilePhase("parsing"):
+        try:
+            pool = parsePool()
+            futures = [
+                pool.submit(parseLogRange, logfilename, start, end, config)
+                for start, end in ranges
+            ]
+            results = [future.result() for future in futures]
+        except (concurrent.futures.process.BrokenProcessPool,
+                RuntimeError) as error:
+            parse_lock.acquire()
+            if parse_state.get("broken") != True:
+                print("Error parsing in worker processes (" +
+                      (str(error) or type(error).__name__) +
+                      "), parsing logs serially")
+            parse_state["broken"] = True
+            parse_lock.release()
+            return None
+
+    for rangetimes, rangevalues in results:
+        inserttimes += rangetimes
+        for metric in rangevalues:
+            metricvalues[metric] += rangevalues[metric]
+
+    return inserttimes, metricvalues
+
 
 ### functions
 # merge sublists
@@ -66,12 +963,839 @@ def mergeSublists(dictionary):
     return merged
 
 
-# run single emulation thread
+# properties of taskset files stored in the manifest
+taskset_properties = [
+    "tasks", "period_min", "period_max", "period_range", "periods_distinct",
+    "utilization"
+]
+
+
+# properties of tasks given as lines with period and wcet columns
+def tasksetProperties(tasklines):
+    periods = []
+    utilization = 0.0
+    for line in tasklines:
+        columns = line.split()
+        try:
+            period = float(columns[taskset_period_column])
+            wcet = float(columns[taskset_wcet_column])
+        except:
+            continue
+        if period > 0:
+            periods.append(period)
+            utilization += wcet / period
+
+    properties = dict.fromkeys(taskset_properties)
+    properties["tasks"] = len(tasklines)
+    if len(periods) > 0:
+        properties["period_min"] = min(periods)
+        properties["period_max"] = max(periods)
+        properties["period_range"] = max(periods) / min(periods)
+        properties["periods_distinct"] = len(set(periods))
+        properties["utilization"] = round(utilization, 6)
+
+    return properties
+
+
+# read id, hash, number of tasks and properties of a taskset file
+def readTaskset(tasksetfilename, filestat):
+    import hashlib
+    with open(tasksetfilename, "rb") as tasksetfile:
+        content = tasksetfile.read()
+    lines = content.decode().split("\n")
+    tasklines = [line for line in lines[1:] if line.strip() != ""]
+
+    return {
+        "size": filestat.st_size,
+        "mtime": filestat.st_mtime_ns,
+        "id": lines[0].strip(),
+        "hash": hashlib.sha256(content).hexdigest(),
+        "tasks": len(tasklines),
+        "properties": tasksetProperties(tasklines)
+    }
+
+
+# load manifest of taskset files and refresh changed directories
+def loadTasksetManifest():
+    manifest = {"sizes": {}}
+    try:
+        with open(taskset_manifest, "r") as manifestfile:
+            manifest = json.load(manifestfile)
+    except:
+        pass
+
+    # parse all files again if the columns changed
+    parser = [taskset_period_column, taskset_wcet_column]
+    changed = False
+    if manifest.get("parser") != parser:
+        manifest = {"sizes": {}, "parser": parser}
+        changed = True
+
+    sizes = {}
+    for sizeentry in os.scandir("tasksets"):
+        if sizeentry.is_dir() == False:
+            continue
+        tasksetsize = sizeentry.name
+        mtime = sizeentry.stat().st_mtime_ns
+        cached = manifest["sizes"].get(tasksetsize)
+
+        # rescan directory, unchanged files are taken from manifest. Files
+        # edited in place do not change the directory, so every file is
+        # checked
+        tasksets = {}
+        for tasksetentry in os.scandir(sizeentry.path):
+            if tasksetentry.is_file() == False:
+                continue
+            filestat = tasksetentry.stat()
+            if cached != None and tasksetentry.name in cached["tasksets"] \
+                and taskset_manifest_verify == False:
+                tasksetitem = cached["tasksets"][tasksetentry.name]
+                if tasksetitem["size"] == filestat.st_size and \
+                    tasksetitem["mtime"] == filestat.st_mtime_ns:
+                    tasksets[tasksetentry.name] = tasksetitem
+                    continue
+            try:
+                tasksets[tasksetentry.name] = readTaskset(
+                    tasksetentry.path, filestat)
+            except:
+                raise EmulationError("Error processing file " +
+                                     tasksetentry.path)
+        sizes[tasksetsize] = {"mtime": mtime, "tasksets": tasksets}
+        if cached == None or cached != sizes[tasksetsize]:
+            changed = True
+
+    if len(sizes) != len(manifest["sizes"]):
+        changed = True
+    manifest["sizes"] = sizes
+    if changed == True:
+        manifestdir = os.path.dirname(taskset_manifest)
+        if manifestdir != "":
+            os.makedirs(manifestdir, exist_ok=True)
+        with open(taskset_manifest + ".tmp", "w") as manifestfile:
+            json.dump(manifest, manifestfile)
+        os.replace(taskset_manifest + ".tmp", taskset_manifest)
+
+    return manifest
+
+
+# taskset sizes of manifest in numerical order
+def tasksetSizes(manifest):
+    return sorted(manifest["sizes"], key=int)
+
+
+# taskset files of given size with their manifest entries
+def tasksetFiles(manifest, tasksetsize, planned=True):
+    tasksets = manifest["sizes"][tasksetsize]["tasksets"]
+    tasksetfiles = [(tasksetfile, tasksets[tasksetfile])
+                    for tasksetfile in sorted(tasksets)]
+    plan = loadPlan()
+    if planned == True and plan != None and tasksetsize in plan["sizes"]:
+        tasksetfiles = tasksetfiles[:plan["sizes"][tasksetsize]["tasksets"]]
+
+    return tasksetfiles
+
+
+# check that name is a taskset property
+def checkProperty(name):
+    if name not in taskset_properties:
+        raise EmulationError("Unknown taskset property " + name +
+                             ", available are " +
+                             ", ".join(taskset_properties))
+
+
+# manifest reduced to tasksets within the ranges of stats_filter
+def filterManifest(manifest):
+    if len(stats_filter) == 0:
+        return manifest
+
+    for name in stats_filter:
+        checkProperty(name)
+    filtered = {"sizes": {}}
+    for tasksetsize in manifest["sizes"]:
+        tasksets = {}
+        for tasksetfile, tasksetitem in manifest["sizes"][tasksetsize][
+                "tasksets"].items():
+            matching = True
+            for name, (lower, upper) in stats_filter.items():
+                value = tasksetitem["properties"][name]
+                if value == None or value < lower or value > upper:
+                    matching = False
+            if matching == True:
+                tasksets[tasksetfile] = tasksetitem
+        if len(tasksets) > 0:
+            filtered["sizes"][tasksetsize] = {
+                "mtime": manifest["sizes"][tasksetsize]["mtime"],
+                "tasksets": tasksets
+            }
+    print(
+        "Using " +
+        str(sum([len(item["tasksets"])
+                 for item in filtered["sizes"].values()])) +
+        " tasksets matching " + json.dumps(stats_filter))
+
+    return filtered
+
+
+# number of runs per taskset of taskset size
+def runsPerSet(tasksetsize):
+    plan = loadPlan()
+    if plan != None and tasksetsize in plan["sizes"]:
+        return plan["sizes"][tasksetsize]["runs"]
+
+    return runs_emulation_per_set
+
+
+plan_cache = {}
+
+
+# plan of tasksets and runs per taskset size, reloaded if changed
+def loadPlan():
+    if emulation_plan == False:
+        return None
+
+    try:
+        key = (plan_file, os.stat(plan_file).st_mtime_ns)
+        if plan_cache.get("key") != key:
+            with open(plan_file, "r") as planfile:
+                plan_cache["plan"] = json.load(planfile)
+            plan_cache["key"] = key
+    except:
+        raise EmulationError("Error reading plan " + plan_file)
+
+    return plan_cache["plan"]
+
+
+# hash of emulator binary by path, with size and modification time it was
+# calculated for
+emulator_hashes = {}
+emulator_hashes_lock = threading.Lock()
+
+
+# hash of emulator binary, calculated again if the binary changed
+def emulatorHash(emulator):
+    binaryname = "./bin/" + emulatorVariant(emulator)["binary"]
+    with emulator_hashes_lock:
+        # rehash binaries rebuilt since the last call
+        binarystat = os.stat(binaryname)
+        version = (binarystat.st_size, binarystat.st_mtime_ns)
+        if binaryname not in emulator_hashes or \
+            emulator_hashes[binaryname][0] != version:
+            import hashlib
+            binaryhash = hashlib.sha256()
+            with open(binaryname, "rb") as binaryfile:
+                for block in iter(lambda: binaryfile.read(1048576), b""):
+                    binaryhash.update(block)
+            emulator_hashes[binaryname] = (version, binaryhash.hexdigest())
+
+        return emulator_hashes[binaryname][1]
+
+
+# key of a single result in result cache
+def resultKey(tasksetitem, emulator, run, iterations):
+    import hashlib
+    variant = emulatorVariant(emulator)
+    arguments = str(iterations)
+    if len(variant["args"]) > 0 or len(variant["env"]) > 0:
+        arguments += " " + json.dumps([variant["args"], variant["env"]],
+                                      sort_keys=True)
+    key = "taskset:" + tasksetitem["hash"] + "\n" + \
+        "emulator:" + emulatorHash(emulator) + "\n" + \
+        "arguments:" + arguments + "\n" + \
+        "run:" + str(run) + "\n"
+
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+# path of result in result cache, without extension
+def resultPath(cachekey):
+    return result_cache_dir + "/" + cachekey[:2] + "/" + cachekey
+
+
+# link or copy file, replacing target
+def linkFile(source, target):
+    import shutil
+    if os.path.lexists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except:
+        shutil.copyfile(source, target)
+
+
+# check whether result cache contains a valid result for key
+def cachedResult(cachekey):
+    try:
+        with open(resultPath(cachekey) + ".json", "r") as metafile:
+            meta = json.load(metafile)
+        if meta["exitcode"] == 0 and \
+            os.path.isfile(resultPath(cachekey) + logExtension()):
+            return True
+    except:
+        pass
+
+    return False
+
+
+# store successful result in result cache
+def storeResult(cachekey, logfilename, emulator, tasksetfilename, run):
+    os.makedirs(os.path.dirname(resultPath(cachekey)), exist_ok=True)
+    linkFile(logfilename, resultPath(cachekey) + logExtension())
+    if os.path.isfile(rusageFilename(logfilename)):
+        linkFile(rusageFilename(logfilename),
+                 rusageFilename(resultPath(cachekey) + logExtension()))
+
+    # metadata is written last, it marks the result as valid
+    with open(resultPath(cachekey) + ".json.tmp", "w") as metafile:
+        json.dump(
+            {
+                "emulator": emulator,
+                "emulator_hash": emulatorHash(emulator),
+                "taskset": tasksetfilename,
+                "run": run,
+                "exitcode": 0,
+                "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            },
+            metafile,
+            sort_keys=True)
+    os.replace(
+        resultPath(cachekey) + ".json.tmp",
+        resultPath(cachekey) + ".json")
+
+
+# reuse cached result for logfile
+def reuseResult(cachekey, logfilename):
+    cachedlogfilename = resultPath(cachekey) + logExtension()
+    if os.path.isfile(logfilename) == False or \
+        os.path.samefile(cachedlogfilename, logfilename) == False:
+        linkFile(cachedlogfilename, logfilename)
+    if os.path.isfile(rusageFilename(cachedlogfilename)):
+        linkFile(rusageFilename(cachedlogfilename),
+                 rusageFilename(logfilename))
+
+
+# find logfile of a run, using result cache if logfile is missing
+def resolveLogfile(logfilename, tasksetsize, tasksetitem, emulator, run):
+    if result_cache == True and os.path.isfile(logfilename) == False:
+        try:
+            cachekey = resultKey(tasksetitem, emulator, run,
+                                 runsPerProcess(tasksetsize))
+            if cachedResult(cachekey) == True:
+                return resultPath(cachekey) + logExtension()
+        except:
+            pass
+
+    return logfilename
+
+
+# archives of logfiles
+archive_lock = threading.Lock()
+archive_indexes = {}
+
+
+# archive file of taskset size and emulator
+def archiveFilename(tasksetsize, emulator):
+    return "log/" + tasksetsize + "/" + emulator + ".archive"
+
+
+# index of archive, later records replace earlier ones of the same run
+def archiveIndex(tasksetsize, emulator):
+    archivefilename = archiveFilename(tasksetsize, emulator)
+    archive_lock.acquire()
+    if archivefilename not in archive_indexes:
+        index = {}
+        try:
+            with open(archivefilename + ".idx", "r") as indexfile:
+                for line in indexfile:
+                    try:
+                        tasksetfile, run, offset, length, meta = \
+                            line.rstrip("\n").split(";", 4)
+                        meta = json.loads(meta)
+                        index[(tasksetfile, int(run))] = {
+                            "offset": int(offset),
+                            "length": int(length),
+                            "key": meta["key"],
+                            "usage": meta["usage"]
+                        }
+                    except:
+                        # incomplete line of interrupted append
+                        pass
+        except:
+            pass
+        archive_indexes[archivefilename] = index
+    index = archive_indexes[archivefilename]
+    archive_lock.release()
+
+    return index
+
+
+# append logfile and resource usage to archive and remove them
+def archiveAppend(logfilename, emulator, tasksetfilename, run, cachekey):
+    import gzip
+    tasksetsize = os.path.basename(os.path.dirname(tasksetfilename))
+    tasksetfile = os.path.basename(tasksetfilename)
+    with open(logfilename, "rb") as logfile:
+        data = logfile.read()
+    if logfilename.endswith(".gz") == False:
+        data = gzip.compress(data, compresslevel=6)
+    usage = readResourceUsage(logfilename)
+
+    # data is written first, records without index line are ignored
+    index = archiveIndex(tasksetsize, emulator)
+    archivefilename = archiveFilename(tasksetsize, emulator)
+    archive_lock.acquire()
+    try:
+        with open(archivefilename, "ab") as archivefile:
+            offset = archivefile.tell()
+            archivefile.write(data)
+        with open(archivefilename + ".idx", "a") as indexfile:
+            indexfile.write(";".join([
+                tasksetfile,
+                str(run),
+                str(offset),
+                str(len(data)),
+                json.dumps({
+                    "key": cachekey,
+                    "usage": usage
+                }, sort_keys=True)
+            ]) + "\n")
+        index[(tasksetfile, run)] = {
+            "offset": offset,
+            "length": len(data),
+            "key": cachekey,
+            "usage": usage
+        }
+    finally:
+        archive_lock.release()
+
+    os.remove(logfilename)
+    if os.path.isfile(rusageFilename(logfilename)):
+        os.remove(rusageFilename(logfilename))
+
+
+# check whether archive contains the result of given cache key
+def archiveContains(tasksetsize, emulator, tasksetfile, run, cachekey):
+    record = archiveIndex(tasksetsize, emulator).get((tasksetfile, run))
+    return record != None and record["key"] == cachekey
+
+
+# read lines of archived log from open archive file
+def readArchiveLines(archivefile, record):
+    import gzip
+    with profilePhase("decompression"):
+        archivefile.seek(record["offset"])
+        data = gzip.decompress(archivefile.read(record["length"]))
+        return data.decode().splitlines(True)
+
+
+# move existing logfiles into archives
+def archiveLogs():
+    print("\nArchiving logfiles ...\n")
+    manifest = loadTasksetManifest()
+    archived = {}
+    for tasksetsize in tasksetSizes(manifest):
+        for emulator in emulatorList():
+            count = 0
+            for tasksetfile, tasksetitem in tasksetFiles(
+                    manifest, tasksetsize, False):
+                for run in range(
+                        0, max(runs_emulation_per_set,
+                               runsPerSet(tasksetsize))):
+                    for extension in [".log.gz", ".log"]:
+                        logfilename = "log/" + tasksetsize + "/" + \
+                            tasksetfile + "-" + emulator + "-" + \
+                            str(run) + extension
+                        if os.path.isfile(logfilename):
+                            archiveAppend(
+                                logfilename, emulator,
+                                "tasksets/" + tasksetsize + "/" + tasksetfile,
+                                run, None)
+                            count += 1
+            if count > 0:
+                print("Archived " + str(count) + " logfiles to " +
+                      archiveFilename(tasksetsize, emulator))
+                archived[archiveFilename(tasksetsize, emulator)] = count
+
+    return archived
+
+
+# restore logfiles from archives and remove archives
+def extractLogs():
+    import gzip
+    print("\nExtracting archives ...\n")
+    manifest = loadTasksetManifest()
+    extracted = {}
+    for tasksetsize in tasksetSizes(manifest):
+        for emulator in emulatorList():
+            archivefilename = archiveFilename(tasksetsize, emulator)
+            if os.path.isfile(archivefilename) == False:
+                continue
+
+            index = archiveIndex(tasksetsize, emulator)
+            with open(archivefilename, "rb") as archivefile:
+                for (tasksetfile, run), record in sorted(index.items()):
+                    logfilename = "log/" + tasksetsize + "/" + \
+                        tasksetfile + "-" + emulator + "-" + str(run) + \
+                        logExtension()
+                    archivefile.seek(record["offset"])
+                    data = archivefile.read(record["length"])
+                    if logfilename.endswith(".gz") == False:
+                        data = gzip.decompress(data)
+                    if os.path.lexists(logfilename):
+                        os.remove(logfilename)
+                    with open(logfilename, "wb") as logfile:
+                        logfile.write(data)
+                    if record["usage"] != None:
+                        writeResourceUsage(logfilename, record["usage"])
+
+            os.remove(archivefilename)
+            os.remove(archivefilename + ".idx")
+            archive_lock.acquire()
+            archive_indexes.pop(archivefilename, None)
+            archive_lock.release()
+            print("Extracted " + str(len(index)) + " logfiles from " +
+                  archivefilename)
+            extracted[archivefilename] = len(index)
+
+    return extracted
+
+
+# run single emulation and collect resource usage of the emulator process
+def runEmulationProcess(emulator, tasksetfilename, logfilename, iterations=1):
+    import subprocess
+    starttime = time.perf_counter()
+    variant = emulatorVariant(emulator)
+    command = ["./bin/" + variant["binary"],
+               str(iterations), tasksetfilename] + variant["args"]
+    environment = None
+    if len(variant["env"]) > 0:
+        environment = dict(os.environ, **variant["env"])
+
+    # never write through an existing link into the result cache
+    if os.path.lexists(logfilename):
+        os.remove(logfilename)
+    with open(logfilename, "wb") as logfile:
+        try:
+            if logfilename.endswith(".gz"):
+                emulation = subprocess.Popen(command,
+                                             env=environment,
+                                             stdout=subprocess.PIPE)
+            else:
+                emulation = subprocess.Popen(command,
+                                             env=environment,
+                                             stdout=logfile)
+        except OSError as error:
+            emulation = None
+            print("Error starting emulator " + command[0] + ": " + str(error))
+
+        compression = None
+        if emulation != None and logfilename.endswith(".gz"):
+            compression = subprocess.Popen(["gzip"],
+                                           stdin=emulation.stdout,
+                                           stdout=logfile)
+            emulation.stdout.close()
+
+        # wait without reaping, s.t. /proc is still available for the zombie
+        usage = {}
+        if emulation != None:
+            os.waitid(os.P_PID, emulation.pid, os.WEXITED | os.WNOWAIT)
+            usage.update(readProcStat(emulation.pid))
+            pid, status, rusage = os.wait4(emulation.pid, 0)
+            emulation.returncode = os.waitstatus_to_exitcode(status)
+        if compression != None:
+            compression.wait()
+
+    # no output is left, exit code as of a shell for a missing command
+    if emulation == None:
+        os.remove(logfilename)
+        return {
+            "exitcode": 127,
+            "time_wall": time.perf_counter() - starttime,
+            "started": False
+        }
+
+    usage.update({
+        "exitcode": emulation.returncode,
+        "time_wall": time.perf_counter() - starttime,
+        "time_user": rusage.ru_utime,
+        "time_system": rusage.ru_stime,
+        "ctxsw_voluntary": rusage.ru_nvcsw,
+        "ctxsw_involuntary": rusage.ru_nivcsw,
+        "faults_minor": rusage.ru_minflt,
+        "faults_major": rusage.ru_majflt,
+        "maxrss_kb": rusage.ru_maxrss
+    })
+
+    return usage
+
+
+# read scheduling information of a process from /proc
+def readProcStat(pid):
+    procstat = {}
+    try:
+        with open("/proc/" + str(pid) + "/stat", "r") as statfile:
+            # skip pid and command, which may contain whitespaces
+            fields = statfile.read().rsplit(")", 1)[1].split()
+        procstat["priority"] = int(fields[15])
+        procstat["nice"] = int(fields[16])
+        procstat["threads"] = int(fields[17])
+        procstat["processor"] = int(fields[36])
+    except:
+        pass
+
+    try:
+        with open("/proc/" + str(pid) + "/sched", "r") as schedfile:
+            for line in schedfile.readlines():
+                if line.startswith("se.nr_migrations"):
+                    procstat["migrations"] = int(line.split(":")[1])
+    except:
+        pass
+
+    return procstat
+
+
+# resource usage columns in statistics per taskset
+rusage_columns = [
+    "time_wall", "time_user", "time_system", "ctxsw_voluntary",
+    "ctxsw_involuntary", "faults_minor", "faults_major", "maxrss_kb",
+    "migrations", "processor"
+]
+
+
+# name of resource usage sidecar of logfile
+def rusageFilename(logfilename):
+    return re.sub("\\.log(\\.gz)?$", "", logfilename) + ".rusage.json"
+
+
+# write resource usage sidecar of logfile
+def writeResourceUsage(logfilename, usage):
+    if os.path.lexists(rusageFilename(logfilename)):
+        os.remove(rusageFilename(logfilename))
+    with open(rusageFilename(logfilename), "w") as rusagefile:
+        json.dump(usage, rusagefile, sort_keys=True)
+
+
+# read resource usage sidecar of logfile, None if not available
+def readResourceUsage(logfilename):
+    try:
+        with open(rusageFilename(logfilename), "r") as rusagefile:
+            return json.load(rusagefile)
+    except:
+        return None
+
+
+# check whether a run was disturbed according to its resource usage
+def runDisturbed(usage):
+    if usage == None:
+        return False
+    if usage.get("ctxsw_involuntary", 0) > disturbed_max_ctxsw_involuntary:
+        return True
+    if usage.get("faults_major", 0) > disturbed_max_faults_major:
+        return True
+    if usage.get("migrations", 0) > disturbed_max_migrations:
+        return True
+
+    return False
+
+
+# extension of logfiles
+def logExtension():
+    if log_compress == True:
+        return ".log.gz"
+
+    return ".log"
+
+
+# read timer values from logfile
+def readInsertTimes(logfilename):
+    return readLog(logfilename)[0]
+
+
+# read timer values and values of further metrics from logfile
+def readLog(logfilename):
+    import gzip
+    if logfilename.endswith(".gz") == False and log_parse_min_size > 0 and \
+        os.path.getsize(logfilename) >= log_parse_min_size:
+        parsed = parseLogParallel(logfilename)
+        if parsed != None:
+            return parsed
+
+    with profilePhase("decompression"):
+        if logfilename.endswith(".gz"):
+            with gzip.open(logfilename, "rt") as logfile:
+                loglines = logfile.readlines()
+        else:
+            with open(logfilename, "r") as logfile:
+                loglines = logfile.readlines()
+
+    return parseLog(loglines)
+
+
+# get timer values of inserts and values of further metrics in one pass
+def parseLog(loglines):
+    inserttimes = []
+    metricvalues = {}
+    metricprefixes = []
+    for metric in log_metrics:
+        metricvalues[metric] = []
+        metricprefixes.append((log_metrics[metric]["prefix"] + ":", metric))
+
+    with profilePhase("parsing"):
+        for line in loglines:
+            if (log_prefix + ":") in line:
+                timeneeded = timerValue(
+                    int(re.sub("\n", "",
+                               line.split(":")[1])))
+                if timeneeded != None:
+                    inserttimes.append(timeneeded)
+                continue
+            for prefix, metric in metricprefixes:
+                if prefix in line:
+                    value = metricValue(metric, line.split(":")[1])
+                    if value != None:
+                        metricvalues[metric].append(value)
+                    break
+
+    return inserttimes, metricvalues
+
+
+# wait until less than limit threads are running
+def waitForThreads(threads, threadslots, limit):
+    while len(threads) >= limit:
+        for i in range(0, len(threads)):
+            if threads[i].is_alive() == False:
+                threads[i].join()
+                threads.pop(i)
+                threadslots.pop(i)
+                break
+        time.sleep(0.01)
+
+
+# number of runs per emulator process for taskset size
+def runsPerProcess(tasksetsize):
+    return max(
+        1,
+        int(
+            runs_per_process.get(tasksetsize,
+                                 runs_per_process.get(int(tasksetsize), 1))))
+
+
+# split output of emulator process with several runs into one log per run,
+# returns filenames of written logs or None for missing runs
+def splitRuns(outputfilename, logfilenames):
+    import gzip
+    runfilenames = []
+    runfile = None
+    with open(outputfilename, "rb") as outputfile:
+        for line in outputfile:
+            if runfile == None:
+                if len(runfilenames) == len(logfilenames):
+                    break
+                runfilename = logfilenames[len(runfilenames)]
+                if len(staging_state) > 0:
+                    runfilename = stagingFilename()
+                elif os.path.lexists(runfilename):
+                    os.remove(runfilename)
+                if runfilename.endswith(".gz"):
+                    runfile = gzip.open(runfilename, "wb", compresslevel=6)
+                else:
+                    runfile = open(runfilename, "wb")
+                runfilenames.append(runfilename)
+            runfile.write(line)
+            if line.decode(errors="replace").startswith(log_run_delimiter):
+                runfile.close()
+                runfile = None
+
+    # incomplete last run
+    if runfile != None:
+        runfile.close()
+        os.remove(runfilenames.pop())
+    os.remove(outputfilename)
+
+    return runfilenames + [None] * (len(logfilenames) - len(runfilenames))
+
+
+# share of a single run of the resource usage of a process with several runs
+def runShare(usage, runs):
+    share = dict(usage)
+    for column in [
+            "time_wall", "time_user", "time_system", "ctxsw_voluntary",
+            "ctxsw_involuntary", "faults_minor", "faults_major"
+    ]:
+        share[column] = usage[column] / float(runs)
+    share["runs_per_process"] = runs
+
+    return share
+
+
+# run single emulation thread, jobs are the runs of one emulator process
 def runEmulationThread(jobstotal, counter_queue, counter_queue_lock, starttime,
-                       emulator, tasksetsize, tasksetid, run, command):
-    os.system(command)
+                       emulator, tasksetsize, tasksetid, jobs, tasksetfilename,
+                       slot, results):
+    jobstarttime = time.perf_counter()
+    jobcputime = time.thread_time()
+    for run, logfilename, cachekey in jobs:
+        metricsJobStarted(emulator, tasksetsize)
+    outputfilename = jobs[0][1]
+    if len(staging_state) > 0:
+        outputfilename = stagingFilename()
+    elif len(jobs) > 1:
+        outputfilename = re.sub("\\.gz$", "", jobs[0][1]) + ".batch"
+    with profilePhase("emulation"):
+        usage = runEmulationProcess(emulator, tasksetfilename, outputfilename,
+                                    len(jobs))
+    if usage.get("started") == False:
+        outputfilenames = [None] * len(jobs)
+    elif len(jobs) > 1:
+        with profilePhase("output"):
+            outputfilenames = splitRuns(outputfilename,
+                                        [job[1] for job in jobs])
+        usage = runShare(usage, len(jobs))
+    else:
+        outputfilenames = [outputfilename]
+
+    for (run, logfilename,
+         cachekey), outputfilename in zip(jobs, outputfilenames):
+        failed = usage["exitcode"] != 0 or outputfilename == None
+        if outputfilename == None:
+            if usage.get("started") != False:
+                print("Missing output of " + logfilename + " in output of " +
+                      "emulator process")
+        elif log_rusage == True:
+            writeResourceUsage(logfilename, usage)
+        results[(emulator, tasksetsize, tasksetid, run)] = {
+            "status": "failed" if failed == True else "completed",
+            "logfile": logfilename,
+            "usage": usage
+        }
+        if result_cache == False or failed == True:
+            cachekey = None
+        if outputfilename == None:
+            pass
+        elif outputfilename != logfilename:
+            stagingFlush(outputfilename, logfilename, cachekey, emulator,
+                         tasksetfilename, run)
+        else:
+            if cachekey != None:
+                storeResult(cachekey, logfilename, emulator, tasksetfilename,
+                            run)
+            if log_archive == True:
+                archiveAppend(logfilename, emulator, tasksetfilename, run,
+                              cachekey)
+        metricsJobFinished(emulator, tasksetsize,
+                           (time.perf_counter() - jobstarttime) / len(jobs),
+                           failed)
+
+        printJobStatus(jobstotal, counter_queue, counter_queue_lock, starttime,
+                       "Completed", emulator, tasksetsize, tasksetid, run)
 
-    # print status
+    profileWorker(slot,
+                  time.perf_counter() - jobstarttime,
+                  time.thread_time() - jobcputime)
+
+
+# print status of finished job
+def printJobStatus(jobstotal, counter_queue, counter_queue_lock, starttime,
+                   action, emulator, tasksetsize, tasksetid, run):
     counter_queue_lock.acquire()
     currentjob = int(counter_queue.get())
     counter_queue.put(currentjob + 1)
@@ -79,7 +1803,7 @@ def runEmulationThread(jobstotal, counter_queue, counter_queue_lock, starttime,
     eta = timedelta(seconds=round((timeneeded.seconds /
                                    ((currentjob + 1) / float(jobstotal))) -
                                   timeneeded.seconds))
-    print("Completed " + emulator + "/" + tasksetsize + "/" + str(tasksetid) +
+    print(action + " " + emulator + "/" + tasksetsize + "/" + str(tasksetid) +
           "/" + str(run) + " (" + str(currentjob + 1) + " of " +
           str(jobstotal) + " - " +
           str(round(((currentjob + 1) / float(jobstotal)) * 100, 2)) +
@@ -87,304 +1811,908 @@ def runEmulationThread(jobstotal, counter_queue, counter_queue_lock, starttime,
     counter_queue_lock.release()
 
 
-# run emulations
-def runEmulations():
-    print("\nStarting emulation process, please wait ...\n")
-    try:
-        os.mkdir("log")
-    except:
-        pass
+# run emulations
+def runEmulations():
+    print("\nStarting emulation process, please wait ...\n")
+    try:
+        os.mkdir("log")
+    except:
+        pass
+
+    # queue and semaphore for jobcounter
+    counter_queue_lock = threading.Semaphore()
+    counter_queue = queue.Queue()
+    counter_queue.put(0)
+    setstotal = 0
+    jobstotal = 0
+
+    # count total sets
+    profileReset()
+    archive_indexes.clear()
+    runstarttime = time.perf_counter()
+    with profilePhase("discovery"):
+        manifest = loadTasksetManifest()
+        for tasksetsize in tasksetSizes(manifest):
+            for emulator in emulatorList():
+                setstotal += len(tasksetFiles(manifest, tasksetsize))
+                jobstotal += len(tasksetFiles(
+                    manifest, tasksetsize)) * runsPerSet(tasksetsize)
+
+    # results per job, keyed by emulator, size, taskset id and run
+    results = {}
+
+    # exceptions of emulation threads
+    errors = []
+
+    if log_run_delimiter == "" and len(runs_per_process) > 0 and \
+        max(runs_per_process.values()) > 1:
+        raise EmulationError("Error running several runs per process " +
+                             "without log_run_delimiter")
+
+    # adaptive number of threads
+    controller = None
+    slotsmax = number_of_threads_emulation
+    if emulation_adaptive == True:
+        controller = controllerCreate()
+        slotsmax = controller["slots_max"]
+
+    # find taskset directories
+    threads = list()
+    threadslots = list()
+    starttime = datetime.now()
+    metricsStart(jobstotal, controllerSlots(controller))
+    stagingStart()
+    writeMatrix()
+    for tasksetsize in tasksetSizes(manifest):
+        tasksetpath = "tasksets/" + tasksetsize
+        try:
+            os.mkdir("log/" + tasksetsize)
+        except:
+            pass
+
+        for emulator in emulatorList():
+            # start threading
+            for tasksetfile, tasksetitem in tasksetFiles(
+                    manifest, tasksetsize):
+                tasksetid = tasksetitem["id"]
+                pending = []
+                for run in range(0, runsPerSet(tasksetsize)):
+                    logfilename = "log/" + tasksetsize + "/" + \
+                        tasksetfile + "-" + emulator + "-" + \
+                        str(run) + logExtension()
+
+                    # reuse result from cache if available
+                    cachekey = None
+                    if result_cache == True:
+                        with profilePhase("dispatch"):
+                            cachekey = resultKey(tasksetitem, emulator, run,
+                                                 runsPerProcess(tasksetsize))
+                            if cachedResult(cachekey) == True:
+                                if log_archive == False:
+                                    reuseResult(cachekey, logfilename)
+                                elif archiveContains(tasksetsize, emulator,
+                                                     tasksetfile, run,
+                                                     cachekey) == False:
+                                    reuseResult(cachekey, logfilename)
+                                    archiveAppend(
+                                        logfilename, emulator,
+                                        tasksetpath + "/" + tasksetfile, run,
+                                        cachekey)
+                                results[(emulator, tasksetsize, tasksetid,
+                                         run)] = {
+                                             "status": "reused",
+                                             "logfile": logfilename,
+                                             "usage": None
+                                         }
+                                metricsJobReused(emulator, tasksetsize)
+                                printJobStatus(jobstotal, counter_queue,
+                                               counter_queue_lock, starttime,
+                                               "Reused", emulator, tasksetsize,
+                                               tasksetid, run)
+                                continue
+
+                    pending.append((run, logfilename, cachekey))
+
+                # one emulator process per batch of runs
+                batchsize = runsPerProcess(tasksetsize)
+                for batch in range(0, len(pending), batchsize):
+                    waitForThreads(threads, threadslots,
+                                   controllerSlots(controller))
+                    if len(errors) > 0:
+                        break
+                    stagingWait()
+                    metricsSlots(controllerSlots(controller))
+
+                    with profilePhase("dispatch"):
+                        slot = min(set(range(0, slotsmax)) - set(threadslots))
+                        threaditem = threading.Thread(
+                            target=catchingThread,
+                            args=(
+                                errors,
+                                runEmulationThread,
+                                jobstotal,
+                                counter_queue,
+                                counter_queue_lock,
+                                starttime,
+                                emulator,
+                                tasksetsize,
+                                tasksetid,
+                                pending[batch:batch + batchsize],
+                                tasksetpath + "/" + tasksetfile,
+                                slot,
+                                results,
+                            ))
+                        threads.append(threaditem)
+                        threadslots.append(slot)
+                        threaditem.start()
+
+                    # start control job after configured interval
+                    if controller != None:
+                        controlled = controller["jobs"]
+                        controller["jobs"] += len(pending[batch:batch +
+                                                          batchsize])
+                        if controlled // emulation_control_interval != \
+                            controller["jobs"] // \
+                            emulation_control_interval and \
+                            controller["running"] == False:
+                            waitForThreads(threads, threadslots,
+                                           controllerSlots(controller))
+                            slot = min(
+                                set(range(0, slotsmax)) - set(threadslots))
+                            controller["running"] = True
+                            threaditem = threading.Thread(
+                                target=catchingThread,
+                                args=(errors, runControlThread, controller))
+                            threads.append(threaditem)
+                            threadslots.append(slot)
+                            threaditem.start()
+
+    # we wait for completion of last threads
+    waitForThreads(threads, threadslots, 1)
+    stagingStop()
+    metricsStop()
+    if len(errors) > 0:
+        raise errors[0]
+
+    profileWrite("run", time.perf_counter() - runstarttime, slotsmax)
+
+    return results
+
+
+# find reference taskset and emulator for calibration and control jobs
+def calibrationJob():
+    tasksetfilename = calibration_taskset
+    if tasksetfilename == "":
+        manifest = loadTasksetManifest()
+        tasksetsizes = tasksetSizes(manifest)
+        if len(tasksetsizes) > 0:
+            tasksetsize = tasksetsizes[-1]
+            tasksetfiles = tasksetFiles(manifest, tasksetsize)
+            if len(tasksetfiles) > 0:
+                tasksetfilename = "tasksets/" + tasksetsize + "/" + \
+                    tasksetfiles[0][0]
+
+    if tasksetfilename == "" or os.path.isfile(tasksetfilename) == False:
+        raise EmulationError("Error finding calibration taskset " +
+                             tasksetfilename)
+
+    emulator = calibration_emulator
+    if emulator == "":
+        emulator = emulatorClasses()[0][0]
+
+    return tasksetfilename, emulator
+
+
+# mean and stdev of logarithmic per-insert times
+def logMeanStdev(samples):
+    import statistics
+    logsamples = [math.log(sample) for sample in samples]
+    if len(logsamples) < 2:
+        return logsamples[0], 0.0
+
+    return sum(logsamples) / len(logsamples), statistics.stdev(logsamples)
+
+
+# test whether per-insert times shifted significantly against baseline
+def timingShifted(baseline, samples):
+    baselinemean, baselinestdev = logMeanStdev(baseline)
+    samplesmean, samplesstdev = logMeanStdev(samples)
+    shift = math.exp(samplesmean - baselinemean) - 1
+    stderr = math.sqrt(baselinestdev**2 / len(baseline) +
+                       samplesstdev**2 / len(samples))
+    if stderr > 0:
+        significant = (samplesmean - baselinemean) / stderr > 1.96
+    else:
+        significant = True
+
+    return shift, significant and shift > calibration_max_shift
+
+
+# run reference job concurrently and return per-insert times
+def runCalibrationBatch(tasksetfilename, emulator, level, batch):
+    import statistics
+    threads = list()
+    logfilenames = []
+    for slot in range(0, level):
+        logfilename = "log/calibration/" + str(level) + "-" + str(batch) + \
+            "-" + str(slot) + logExtension()
+        logfilenames.append(logfilename)
+        thread = threading.Thread(target=runEmulationProcess,
+                                  args=(emulator, tasksetfilename,
+                                        logfilename))
+        threads.append(thread)
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    samples = []
+    for logfilename in logfilenames:
+        try:
+            samples.append(
+                statistics.geometric_mean(readInsertTimes(logfilename)))
+        except:
+            print("Error processing file " + logfilename + ", ignoring")
+        try:
+            os.remove(logfilename)
+        except:
+            pass
+
+    return samples
+
+
+# find highest number of concurrent emulations without timing shift
+def calibrateEmulation():
+    import statistics
+    print("\nStarting calibration, please wait ...\n")
+    try:
+        os.makedirs("log/calibration")
+    except:
+        pass
+
+    tasksetfilename, emulator = calibrationJob()
+    levels = []
+    level = 1
+    while level < number_of_threads_emulation:
+        levels.append(level)
+        level *= 2
+    levels.append(number_of_threads_emulation)
+
+    calibration = {
+        "taskset": tasksetfilename,
+        "emulator": emulator,
+        "levels": {},
+        "slots_max": 1
+    }
+    baseline = []
+    for level in levels:
+        samples = []
+        batch = 0
+        while len(samples) < calibration_runs:
+            samples += runCalibrationBatch(tasksetfilename, emulator, level,
+                                           batch)
+            batch += 1
+            if batch >= calibration_runs and len(samples) == 0:
+                raise EmulationError("Error running calibration job " +
+                                     emulator + " " + tasksetfilename)
+
+        if level == 1:
+            baseline = samples
+            calibration["time_perinsert"] = statistics.geometric_mean(baseline)
+        shift, shifted = timingShifted(baseline, samples)
+        calibration["levels"][str(level)] = {
+            "runs": len(samples),
+            "time_perinsert": statistics.geometric_mean(samples),
+            "shift": shift,
+            "shifted": shifted
+        }
+        print("Calibrated " + str(level) + " threads: " +
+              str(round(statistics.geometric_mean(samples))) +
+              " per insert, shift " + str(round(shift * 100, 2)) + "%" +
+              (" (significant)" if shifted == True else ""))
+        if shifted == True:
+            break
+        calibration["slots_max"] = level
+
+    try:
+        os.rmdir("log/calibration")
+    except:
+        pass
+
+    with open("log/calibration.json", "w") as calibrationfile:
+        json.dump(calibration, calibrationfile, indent=2, sort_keys=True)
+    print("\nUsing up to " + str(calibration["slots_max"]) +
+          " emulation threads, written to log/calibration.json")
+
+    return calibration
+
+
+# create controller for adaptive number of emulation threads
+def controllerCreate():
+    tasksetfilename, emulator = calibrationJob()
+    controller = {
+        "lock": threading.Lock(),
+        "taskset": tasksetfilename,
+        "emulator": emulator,
+        "slots_max": number_of_threads_emulation,
+        "baseline": [],
+        "samples": [],
+        "jobs": 0,
+        "controls": 0,
+        "running": False
+    }
+    try:
+        with open("log/calibration.json", "r") as calibrationfile:
+            calibration = json.load(calibrationfile)
+        if calibration["taskset"] == tasksetfilename and \
+            calibration["emulator"] == emulator:
+            controller["slots_max"] = calibration["slots_max"]
+            controller["baseline"] = [calibration["time_perinsert"]]
+    except:
+        print("No calibration found, using up to " +
+              str(number_of_threads_emulation) + " emulation threads")
+
+    controller["slots"] = controller["slots_max"]
+    try:
+        os.mkdir("log/control")
+    except:
+        pass
+    with open("log/controller.csv", "w") as controllerfile:
+        controllerfile.write("time;jobs;load;time_perinsert;drift;threads\n")
+
+    return controller
+
+
+# current number of emulation threads
+def controllerSlots(controller):
+    if controller == None:
+        return number_of_threads_emulation
+
+    return controller["slots"]
+
+
+# run control job and adapt number of emulation threads, the controller is
+# free for the next control job in any case
+def runControlThread(controller):
+    try:
+        controlJob(controller)
+    finally:
+        controller["running"] = False
+
+
+# run control job, the drift is the mean of the last control jobs against
+# the calibration, s.t. single noisy jobs do not change the threads
+def controlJob(controller):
+    import statistics
+    logfilename = "log/control/control-" + str(controller["controls"]) + \
+        logExtension()
+    controller["controls"] += 1
+    runEmulationProcess(controller["emulator"], controller["taskset"],
+                        logfilename)
+    try:
+        timeperinsert = statistics.geometric_mean(readInsertTimes(logfilename))
+        os.remove(logfilename)
+    except:
+        print("Error processing control job " + logfilename)
+        return
+
+    with controller["lock"]:
+        # the load average contains the running emulations, the control job
+        # included, and follows changes of the threads only slowly
+        load = max(0,
+                   os.getloadavg()[0] - controller["slots"]) / os.cpu_count()
+
+        # first control job without calibration is the baseline
+        if len(controller["baseline"]) == 0:
+            controller["baseline"].append(timeperinsert)
+        controller["samples"] = (controller["samples"] +
+                                 [timeperinsert])[-emulation_control_samples:]
+        drift = statistics.geometric_mean(
+            controller["samples"]) / controller["baseline"][0] - 1
+        samples = len(controller["samples"])
+
+        # samples of the previous number of threads are not used again, also
+        # the load is only checked again after as many control jobs
+        slots = controller["slots"]
+        if samples >= emulation_control_samples:
+            if load > emulation_max_load or drift > calibration_max_shift:
+                controller["slots"] = max(1, slots - 1)
+            elif drift < calibration_max_shift / 2:
+                controller["slots"] = min(controller["slots_max"], slots + 1)
+        if controller["slots"] != slots:
+            controller["samples"] = []
+
+        with open("log/controller.csv", "a") as controllerfile:
+            controllerfile.write(datetime.now().strftime("%Y-%m-%d %H:%M:%S") +
+                                 ";" + str(controller["jobs"]) + ";" +
+                                 str(round(load, 2)) + ";" +
+                                 str(round(timeperinsert)) + ";" +
+                                 str(round(drift, 4)) + ";" +
+                                 str(controller["slots"]) + "\n")
+        print("Control job: drift " + str(round(drift * 100, 2)) +
+              "% (mean of " + str(samples) + "), load " + str(round(load, 2)) +
+              ", using " + str(controller["slots"]) + " emulation threads")
+
+
+# fields of statistics per run, full statistics contain all fields
+def statsFields(full):
+    if full == True:
+        fields = [
+            "inserts", "time_total", "time_perinsert_mean",
+            "time_perinsert_min", "time_perinsert_max", "time_perinsert_stdev",
+            "time_perinsert_err"
+        ]
+    else:
+        fields = [
+            "inserts", "time_total", "time_perinsert_mean",
+            "time_perinsert_stdev"
+        ]
+
+    # filtered statistics are written next to the raw ones
+    if stats_outlier_filter != "":
+        fields.append("outliers")
+        for field in fields[:]:
+            if field.startswith("time_perinsert_"):
+                fields.append(field + "_filtered")
+
+    # steady state statistics are computed from the raw values
+    if stats_warmup_filter != "":
+        fields.append("warmup")
+        for field in fields[:]:
+            if field.startswith("time_perinsert_") and \
+                field.endswith("_filtered") == False:
+                fields.append(field + "_steady")
+
+    # one column group per further metric
+    for metric in log_metrics:
+        if full == True:
+            fields += [
+                metric + "_count", metric + "_total", metric + "_mean",
+                metric + "_min", metric + "_max", metric + "_stdev",
+                metric + "_err"
+            ]
+        else:
+            fields += [
+                metric + "_count", metric + "_total", metric + "_mean",
+                metric + "_stdev"
+            ]
+
+    return fields
+
+
+# timing fields that are averaged geometrically over runs and tasksets, also
+# with the suffixes _filtered and _steady, all other fields (counts, minimums,
+# deviations, errors and further metrics) are averaged arithmetically
+stats_geometric_fields = [
+    "time_total", "time_perinsert_mean", "time_perinsert_max"
+]
+
+
+# handle negative timer values caused by timer wraparound
+def timerValue(timeneeded):
+    if timeneeded < 0:
+        if timer_wrap_mode == "add":
+            timeneeded %= timer_wrap_modulus
+        elif timer_wrap_mode == "drop":
+            return None
+    if timer_max_value > 0 and timeneeded > timer_max_value:
+        return None
+
+    return timeneeded
+
+
+# parse value of further metric and handle its wraparound
+def metricValue(metric, text):
+    if log_metrics[metric].get("parse", "int") == "float":
+        value = float(text)
+    else:
+        value = int(text)
+
+    wrap = log_metrics[metric].get("wrap", "timer")
+    if wrap == "timer":
+        return timerValue(value)
+    if value < 0:
+        if wrap == "add":
+            value %= timer_wrap_modulus
+        elif wrap == "drop":
+            return None
+
+    return value
+
+
+# statistics of the values of a further metric
+def metricStatistics(metric, values):
+    import statistics
+    metricstats = {
+        metric + "_count": len(values),
+        metric + "_total": sum(values),
+        metric + "_mean": 0,
+        metric + "_min": 0,
+        metric + "_max": 0,
+        metric + "_stdev": 0,
+        metric + "_err": 0
+    }
+    if len(values) > 0:
+        metricstats[metric + "_mean"] = round(sum(values) / len(values), 3)
+        metricstats[metric + "_min"] = min(values)
+        metricstats[metric + "_max"] = max(values)
+    if len(values) > 1:
+        metricstdev = statistics.stdev(values)
+        metricstats[metric + "_stdev"] = round(metricstdev, 3)
+        metricstats[metric + "_err"] = round(
+            metricstdev / math.sqrt(len(values)), 3)
+
+    return metricstats
+
+
+# remove outliers of a single run, based on median absolute deviation or
+# interquartile range of the sorted values
+def filterOutliers(inserttimes):
+    import statistics
+    if len(inserttimes) < 4:
+        return inserttimes
+
+    sortedtimes = sorted(inserttimes)
+    if stats_outlier_filter == "mad":
+        median = statistics.median(sortedtimes)
+        mad = statistics.median([abs(value - median) for value in sortedtimes])
+        if mad == 0:
+            return inserttimes
+        # 0.6745 scales the MAD to the standard deviation of normal data
+        limit = stats_outlier_threshold * mad / 0.6745
+        lower = median - limit
+        upper = median + limit
+    elif stats_outlier_filter == "iqr":
+        quartiles = statistics.quantiles(sortedtimes, n=4)
+        iqr = quartiles[2] - quartiles[0]
+        lower = quartiles[0] - stats_outlier_threshold * iqr
+        upper = quartiles[2] + stats_outlier_threshold * iqr
+    else:
+        return inserttimes
+
+    return [value for value in inserttimes if lower <= value <= upper]
+
+
+# number of warm-up inserts by MSER truncation, the truncation point minimizes
+# the squared standard error of the remaining values and is found with suffix
+# sums in linear time
+def warmupTruncation(inserttimes):
+    batch = 5 if stats_warmup_filter == "mser5" else 1
+    values = [
+        sum(inserttimes[i:i + batch])
+        for i in range(0,
+                       len(inserttimes) - batch + 1, batch)
+    ]
+    limit = min(int(len(values) * stats_warmup_max_fraction), len(values) - 2)
+
+    # sums of batches instead of means do not change the minimum
+    truncation = 0
+    minimum = None
+    suffixsum = 0
+    suffixsquares = 0
+    for i in range(len(values) - 1, -1, -1):
+        suffixsum += values[i]
+        suffixsquares += values[i] * values[i]
+        if i > limit:
+            continue
+        remaining = len(values) - i
+        mser = (remaining * suffixsquares - suffixsum * suffixsum) / \
+            remaining**3
+        if minimum == None or mser <= minimum:
+            truncation = i
+            minimum = mser
+
+    return truncation * batch
+
+
+# calculate statistics of timer values
+def timeStatistics(inserttimes):
+    import statistics
+    runstats = {}
+    runstats["inserts"] = len(inserttimes)
+    runstats["time_total"] = sum(inserttimes)
+    runstats["time_perinsert_mean"] = int(
+        statistics.geometric_mean(inserttimes))
+    runstats["time_perinsert_min"] = min(inserttimes)
+    runstats["time_perinsert_max"] = max(inserttimes)
+    time_stdev = statistics.stdev(inserttimes)
+    runstats["time_perinsert_stdev"] = int(time_stdev)
+    runstats["time_perinsert_err"] = int(time_stdev /
+                                         math.sqrt(len(inserttimes)))
+
+    return runstats
+
+
+# calculate statistics of a single run, including filtered statistics
+def runStatistics(inserttimes, metricvalues={}):
+    runstats = timeStatistics(inserttimes)
+
+    if stats_outlier_filter != "":
+        filteredtimes = filterOutliers(inserttimes)
+        runstats["outliers"] = len(inserttimes) - len(filteredtimes)
+        filteredstats = timeStatistics(filteredtimes)
+        for field in filteredstats:
+            if field.startswith("time_perinsert_"):
+                runstats[field + "_filtered"] = filteredstats[field]
+
+    if stats_warmup_filter != "":
+        warmup = warmupTruncation(inserttimes)
+        runstats["warmup"] = warmup
+        steadystats = timeStatistics(inserttimes[warmup:])
+        for field in steadystats:
+            if field.startswith("time_perinsert_"):
+                runstats[field + "_steady"] = steadystats[field]
+
+    for metric in log_metrics:
+        runstats.update(metricStatistics(metric, metricvalues.get(metric, [])))
+
+    return runstats
+
+
+# mean of the values of a field
+def meanValue(field, values):
+    import statistics
+    if len(values) == 0:
+        return float("nan")
+    basefield = field
+    for suffix in ["_filtered", "_steady"]:
+        if basefield.endswith(suffix):
+            basefield = basefield[:-len(suffix)]
+    if basefield not in stats_geometric_fields:
+        return sum(values) / len(values)
+
+    # a zero value makes the geometric mean zero, negative values leave it
+    # undefined
+    if min(values) < 0:
+        return float("nan")
+    if min(values) == 0:
+        return 0.0
+    return statistics.geometric_mean(values)
+
+
+# flat list of all emulators
+def emulatorList():
+    emulatorlist = []
+    for emulatorclass in emulatorClasses():
+        for emulator in emulatorclass:
+            if emulator not in emulatorlist:
+                emulatorlist.append(emulator)
+
+    return emulatorlist
 
-    # queue and semaphore for jobcounter
-    counter_queue_lock = threading.Semaphore()
-    counter_queue = queue.Queue()
-    counter_queue.put(0)
-    setstotal = 0
 
-    # count total sets
-    for tasksetsize_item in os.walk("tasksets"):
-        tasksetpath = tasksetsize_item[0]
-        if (tasksetpath != "tasksets"):
-            tasksetsize = tasksetpath.split("/")[1]
-            for emulatorclass in emulators:
-                for emulator in emulatorclass:
-                    setstotal += len(os.listdir(tasksetpath))
-    jobstotal = runs_emulation_per_set * setstotal
+# emulators of the job matrix with binary, arguments and environment by
+# name and in sublists with the same values of all axes. Emulators with the
+# same binary, arguments and environment are one job under the first name
+def emulatorMatrix():
+    import itertools
+    axes = list(emulation_matrix)
+    combinations = list(
+        itertools.product(*[list(emulation_matrix[axis]) for axis in axes]))
+    classes = []
+    variants = {}
+    identities = {}
+    for emulatorclass in emulators:
+        for combination in combinations:
+            variantclass = []
+            for emulator in emulatorclass:
+                name = emulator
+                variant = {
+                    "binary": emulator,
+                    "args": [],
+                    "env": {},
+                    "axes": {}
+                }
+                for axis, label in zip(axes, combination):
+                    value = emulation_matrix[axis][label]
+                    name += "@" + axis + "=" + label
+                    variant["args"] += [
+                        str(argument) for argument in value.get("args", [])
+                    ]
+                    for variable in value.get("env", {}):
+                        variant["env"][variable] = str(value["env"][variable])
+                    variant["axes"][axis] = label
+                identity = json.dumps(
+                    [emulator, variant["args"], variant["env"]],
+                    sort_keys=True)
+                if identity not in identities:
+                    identities[identity] = name
+                    variants[name] = variant
+                variantclass.append(identities[identity])
+            if variantclass not in classes:
+                classes.append(variantclass)
 
-    # find taskset directories
-    threads = list()
-    starttime = datetime.now()
-    for tasksetsize_item in os.walk("tasksets"):
-        tasksetpath = tasksetsize_item[0]
-        if (tasksetpath != "tasksets"):
-            tasksetsize = tasksetpath.split("/")[1]
-            try:
-                os.mkdir("log/" + tasksetsize)
-            except:
-                pass
+    return classes, variants
 
-            for emulatorclass in emulators:
-                for emulator in emulatorclass:
-                    # start threading
-                    for tasksetfile in os.listdir(tasksetpath):
-                        try:
-                            with open(tasksetpath + "/" + tasksetfile,
-                                      "r") as tf:
-                                tasksetid = re.sub("\n", "", tf.readline())
-                        except:
-                            print("Error processing file " + tasksetpath +
-                                  "/" + tasksetfile)
-                            sys.exit(1)
-                        for run in range(0, runs_emulation_per_set):
-                            if log_compress == True:
-                                command = "./bin/" + emulator + " 1 " + \
-                                    tasksetpath + "/" + tasksetfile + \
-                                    " | gzip > log/" + tasksetsize + "/" + \
-                                    tasksetfile + "-" + emulator + "-" + \
-                                    str(run) + ".log.gz"
-                            else:
-                                command = "./bin/" + emulator + " 1 " + \
-                                    tasksetpath + "/" + tasksetfile + \
-                                    " > log/" + tasksetsize + "/" + \
-                                    tasksetfile + "-" + emulator + "-" + \
-                                    str(run) + ".log"
-                            while len(threads) >= number_of_threads_emulation:
-                                for i in range(0, len(threads)):
-                                    if threads[i].is_alive() == False:
-                                        threads[i].join()
-                                        threads.pop(i)
-                                        break
-                                time.sleep(0.01)
 
-                            threaditem = threading.Thread(
-                                target=runEmulationThread,
-                                args=(
-                                    jobstotal,
-                                    counter_queue,
-                                    counter_queue_lock,
-                                    starttime,
-                                    emulator,
-                                    tasksetsize,
-                                    tasksetid,
-                                    run,
-                                    command,
-                                ))
-                            threads.append(threaditem)
-                            threaditem.start()
+# sublists of emulators of the job matrix
+def emulatorClasses():
+    return emulatorMatrix()[0]
 
-    # we wait for completion of last threads
-    while len(threads) > 1:
-        for i in range(0, len(threads)):
-            if threads[i].is_alive() == False:
-                threads[i].join()
-                threads.pop(i)
-                break
-        time.sleep(0.01)
+
+# binary, arguments and environment of an emulator of the job matrix
+def emulatorVariant(emulator):
+    variants = emulatorMatrix()[1]
+    if emulator in variants:
+        return variants[emulator]
+
+    return {"binary": emulator, "args": [], "env": {}, "axes": {}}
+
+
+# write emulators of job matrix with their axis values to matrix.csv/.dat
+def writeMatrix():
+    if len(emulation_matrix) == 0:
+        return
+
+    lines = [";".join(["emulator", "binary"] + list(emulation_matrix))]
+    for emulator in emulatorList():
+        variant = emulatorVariant(emulator)
+        lines.append(
+            ";".join([emulator, variant["binary"]] +
+                     [variant["axes"][axis] for axis in emulation_matrix]))
+    writeStatistics("./log/matrix.csv", lines, ";")
+    writeStatistics("./log/matrix.dat", lines, " ")
 
 
 # function for single gathering thread
 def gatherThread(threadid, setstotal, counter_queue, counter_queue_lock,
-                 starttime, emulator, tasksetsize, tasksetpath, queue):
+                 starttime, emulator, tasksetsize, tasksetfiles, queue, slot):
+    threadstarttime = time.perf_counter()
+    threadcputime = time.thread_time()
+    fields = statsFields(True)
+
     # add list for specific setsize to fulldata sublist of given emulator
-    emulatordatasetsizelist = {
-        'sizes': {},
-        'ids': {},
-        'inserts': {},
-        'time_total': {},
-        'time_perinsert_mean': {},
-        'time_perinsert_min': {},
-        'time_perinsert_max': {},
-        'time_perinsert_stdev': {},
-        'time_perinsert_err': {}
-    }
+    emulatordatasetsizelist = {'sizes': {}, 'ids': {}, 'rusage': {}}
+    histogram = {}
+    missing = []
+    for field in fields:
+        emulatordatasetsizelist[field] = {}
+
+    # archived logs are read from one open file per thread
+    archiveindex = archiveIndex(tasksetsize, emulator)
+    archivefile = None
+    if len(archiveindex) > 0:
+        archivefile = open(archiveFilename(tasksetsize, emulator), "rb")
 
-    for tasksetfile in os.listdir(tasksetpath):
+    for tasksetfile, tasksetitem in tasksetfiles:
+        tasksetid = tasksetitem["id"]
         if stats_per_set_csv == True or stats_per_set_dat == True:
-            taskset_per_emulator_run_stats = "size;id;run;inserts;time_total;\
-                time_perinsert_mean;time_perinsert_min;time_perinsert_max;\
-                time_perinsert_stdev;time_perinsert_err\n"
+            header = ["size", "id", "run"] + fields
+            if stats_per_set_rusage == True:
+                header += rusage_columns
+            taskset_per_emulator_run_stats = [";".join(header)]
 
         taskset_per_emulator_run_sizes = []
         taskset_per_emulator_run_ids = []
-        taskset_per_emulator_run_inserts = []
-        taskset_per_emulator_run_time_total = []
-        taskset_per_emulator_run_time_perinsert = []
-        taskset_per_emulator_run_time_min = []
-        taskset_per_emulator_run_time_max = []
-        taskset_per_emulator_run_time_stdev = []
-        taskset_per_emulator_run_time_err = []
+        taskset_per_emulator_run_data = {}
+        for field in fields:
+            taskset_per_emulator_run_data[field] = []
+        taskset_per_emulator_run_rusage = []
 
-        try:
-            with open(tasksetpath + "/" + tasksetfile, "r") as tf:
-                tasksetid = re.sub("\n", "", tf.readline())
-        except:
-            print("Error processing file " + tasksetpath + "/" + tasksetfile)
-            sys.exit(1)
-
-        successfull_runs = []
-        for run in range(0, runs_emulation_per_set):
-            # save to fulldata item
-            currentrun = run
-            successfull = False
-            while successfull == False:
-                try:
-                    # get size
-                    if stats_per_set_csv == True or stats_per_set_dat == True:
-                        taskset_per_emulator_run_stats += str(
-                            int(tasksetsize)) + ";"
-                    taskset_per_emulator_run_sizes.append(str(
-                        int(tasksetsize)))
-                    # get id
-                    if stats_per_set_csv == True or stats_per_set_dat == True:
-                        taskset_per_emulator_run_stats += tasksetid + ";"
-                    taskset_per_emulator_run_ids.append(tasksetid)
-                    # get run
-                    if stats_per_set_csv == True or stats_per_set_dat == True:
-                        taskset_per_emulator_run_stats += str(run) + ";"
-
-                    # now get stats from file
-                    inserttimes = []
-
-                    if log_compress == True:
-                        logfilename = "./log/" + tasksetsize + "/" + \
-                            tasksetfile + "-" + emulator + "-" + \
-                            str(currentrun) + ".log.gz"
-                        with gzip.open(logfilename, "rt") as logfile:
-                            for line in logfile.readlines():
-                                if (log_prefix + ":") in line:
-                                    timeneeded = int(
-                                        re.sub("\n", "",
-                                               line.split(":")[1]))
-                                    if timeneeded < 0:
-                                        timeneeded += 1000000000
-                                    inserttimes.append(timeneeded)
-                    else:
-                        logfilename = "./log/" + tasksetsize + "/" + \
-                        tasksetfile + "-" + emulator + "-" + \
-                        str(currentrun) + ".log"
-                        with open(logfilename, "r") as logfile:
-                            for line in logfile.readlines():
-                                if (log_prefix + ":") in line:
-                                    timeneeded = int(
-                                        re.sub("\n", "",
-                                               line.split(":")[1]))
-                                    if timeneeded < 0:
-                                        timeneeded += 1000000000
-                                    inserttimes.append(timeneeded)
-
-                    # write results per run to result string
-                    if stats_per_set_csv == True or stats_per_set_dat == True:
-                        taskset_per_emulator_run_stats += str(
-                            len(inserttimes)) + ";"
-                        taskset_per_emulator_run_stats += str(
-                            sum(inserttimes)) + ";"
-                        taskset_per_emulator_run_stats += str(
-                            int(geometric_mean(inserttimes))) + ";"
-                        taskset_per_emulator_run_stats += str(
-                            min(inserttimes)) + ";"
-                        taskset_per_emulator_run_stats += str(
-                            max(inserttimes)) + ";"
-                        taskset_per_emulator_run_stats += str(
-                            int(stdev(inserttimes))) + ";"
-                        taskset_per_emulator_run_stats += str(
-                            int(
-                                stdev(inserttimes) /
-                                math.sqrt(len(inserttimes)))) + "\n"
-
-                    # write results to taskset list
-                    taskset_per_emulator_run_inserts.append(len(inserttimes))
-                    taskset_per_emulator_run_time_total.append(
-                        sum(inserttimes))
-                    taskset_per_emulator_run_time_perinsert.append(
-                        int(geometric_mean(inserttimes)))
-                    taskset_per_emulator_run_time_min.append(min(inserttimes))
-                    taskset_per_emulator_run_time_max.append(max(inserttimes))
-                    taskset_per_emulator_run_time_stdev.append(
-                        int(stdev(inserttimes)))
-                    taskset_per_emulator_run_time_err.append(
-                        int(stdev(inserttimes) / math.sqrt(len(inserttimes))))
-
-                    successfull = True
-                    successfull_runs.append(run)
-
-                except:
-                    if len(successfull_runs) > 0:
-                        print("Error processing file " + logfilename +
-                              ", using data of run " +
-                              str(successfull_runs[-1]) + " as fallback")
-                        currentrun = successfull_runs[-1]
-                    else:
-                        if currentrun < (runs_emulation_per_set - 1):
-                            print("Error processing file " + logfilename +
-                                  ", using data of run " +
-                                  str(currentrun + 1) + " as fallback")
-                            currentrun += 1
-                        else:
-                            print(
-                                "Error processing file " + logfilename +
-                                " and no alternative successfull runs" + 
-                                " available, exiting."
-                            )
-                            sys.exit(1)
-
-        # append geometric means of runs
+        for run in range(0, runsPerSet(tasksetsize)):
+            try:
+                # now get stats from file or archive
+                logfilename = "./log/" + tasksetsize + "/" + \
+                    tasksetfile + "-" + emulator + "-" + \
+                    str(run) + logExtension()
+                record = archiveindex.get((tasksetfile, run))
+                if record != None and \
+                    os.path.isfile(logfilename) == False:
+                    logfilename = archiveFilename(
+                        tasksetsize, emulator) + ":" + tasksetfile + \
+                        "-" + str(run)
+                    inserttimes, metricvalues = parseLog(
+                        readArchiveLines(archivefile, record))
+                    usage = record["usage"]
+                else:
+                    logfilename = resolveLogfile(logfilename, tasksetsize,
+                                                 tasksetitem, emulator, run)
+                    inserttimes, metricvalues = readLog(logfilename)
+                    usage = readResourceUsage(logfilename)
+
+                # check resource usage of run
+                if stats_exclude_disturbed == True and runDisturbed(
+                        usage) == True:
+                    print("Run " + logfilename + " was disturbed")
+                    raise ValueError("disturbed run " + logfilename)
+
+                # calculate results of run
+                with profilePhase("aggregation"):
+                    runstats = runStatistics(inserttimes, metricvalues)
+                    if stats_distribution == True:
+                        mergeHistogram(histogram, runHistogram(inserttimes))
+
+                # export downsampled series of run
+                if stats_series != "":
+                    writeSeries(
+                        "./log/" + tasksetsize + "/" + tasksetfile + "-" +
+                        emulator + "-" + str(run) + ".series.dat", inserttimes)
+
+                # write results per run to result string
+                if stats_per_set_csv == True or stats_per_set_dat == True:
+                    row = [str(int(tasksetsize)), tasksetid, str(run)]
+                    for field in fields:
+                        row.append(str(runstats[field]))
+                    if stats_per_set_rusage == True:
+                        for column in rusage_columns:
+                            if usage != None and column in usage:
+                                row.append(str(usage[column]))
+                            else:
+                                row.append("nan")
+                    taskset_per_emulator_run_stats.append(";".join(row))
+
+                # write results to taskset list
+                taskset_per_emulator_run_sizes.append(str(int(tasksetsize)))
+                taskset_per_emulator_run_ids.append(tasksetid)
+                for field in fields:
+                    taskset_per_emulator_run_data[field].append(
+                        runstats[field])
+                taskset_per_emulator_run_rusage.append(usage)
+            except Exception as error:
+                # missing runs are reported instead of replaced
+                print("Error processing file " + logfilename + ", run " +
+                      str(run) + " is missing")
+                missing.append({
+                    "size": int(tasksetsize),
+                    "emulator": emulator,
+                    "taskset": tasksetfile,
+                    "id": tasksetid,
+                    "run": run,
+                    "logfile": logfilename,
+                    "error": str(error) or type(error).__name__
+                })
+
+        # append means of runs
         if stats_per_set_csv == True or stats_per_set_dat == True:
-            taskset_per_emulator_run_stats += str(
-                int(taskset_per_emulator_run_sizes[0])) + ";"
-            taskset_per_emulator_run_stats += str(
-                taskset_per_emulator_run_ids[0]) + ";"
-            taskset_per_emulator_run_stats += "mean;"
-            taskset_per_emulator_run_stats += str(
-                int(geometric_mean(taskset_per_emulator_run_inserts))) + ";"
-            taskset_per_emulator_run_stats += str(
-                int(geometric_mean(taskset_per_emulator_run_time_total))) + ";"
-            taskset_per_emulator_run_stats += str(
-                int(geometric_mean(
-                    taskset_per_emulator_run_time_perinsert))) + ";"
-            taskset_per_emulator_run_stats += str(
-                int(geometric_mean(taskset_per_emulator_run_time_min))) + ";"
-            taskset_per_emulator_run_stats += str(
-                int(geometric_mean(taskset_per_emulator_run_time_max))) + ";"
-            taskset_per_emulator_run_stats += str(
-                int(geometric_mean(taskset_per_emulator_run_time_stdev))) + ";"
-            taskset_per_emulator_run_stats += str(
-                int(geometric_mean(taskset_per_emulator_run_time_err))) + "\n"
+            row = [str(int(tasksetsize)), tasksetid, "mean"]
+            for field in fields:
+                value = meanValue(field, taskset_per_emulator_run_data[field])
+                if math.isnan(value):
+                    row.append("nan")
+                else:
+                    row.append(str(int(value)))
+            if stats_per_set_rusage == True:
+                # arithmetic mean, as counters are often zero
+                for column in rusage_columns:
+                    values = [
+                        usage[column]
+                        for usage in taskset_per_emulator_run_rusage
+                        if usage != None and column in usage
+                    ]
+                    if len(values) > 0:
+                        row.append(str(round(sum(values) / len(values), 3)))
+                    else:
+                        row.append("nan")
+            taskset_per_emulator_run_stats.append(";".join(row))
 
         # save to fulldata item
         emulatordatasetsizelist['sizes'][int(
             tasksetid)] = taskset_per_emulator_run_sizes
         emulatordatasetsizelist['ids'][int(
             tasksetid)] = taskset_per_emulator_run_ids
-        emulatordatasetsizelist['inserts'][int(
-            tasksetid)] = taskset_per_emulator_run_inserts
-        emulatordatasetsizelist['time_total'][int(
-            tasksetid)] = taskset_per_emulator_run_time_total
-        emulatordatasetsizelist['time_perinsert_mean'][int(
-            tasksetid)] = taskset_per_emulator_run_time_perinsert
-        emulatordatasetsizelist['time_perinsert_min'][int(
-            tasksetid)] = taskset_per_emulator_run_time_min
-        emulatordatasetsizelist['time_perinsert_max'][int(
-            tasksetid)] = taskset_per_emulator_run_time_max
-        emulatordatasetsizelist['time_perinsert_stdev'][int(
-            tasksetid)] = taskset_per_emulator_run_time_stdev
-        emulatordatasetsizelist['time_perinsert_err'][int(
-            tasksetid)] = taskset_per_emulator_run_time_err
+        emulatordatasetsizelist['rusage'][int(
+            tasksetid)] = taskset_per_emulator_run_rusage
+        for field in fields:
+            emulatordatasetsizelist[field][int(
+                tasksetid)] = taskset_per_emulator_run_data[field]
 
         # write to intermediate file
-        if stats_per_set_csv == True:
-            with open(
-                    "./log/" + tasksetsize + "/" + tasksetfile + "-" +
-                    emulator + ".csv",
-                    "w") as perffiletaskset_per_emulator_run:
-                perffiletaskset_per_emulator_run.write(
-                    taskset_per_emulator_run_stats)
-        if stats_per_set_dat == True:
-            with open(
-                    "./log/" + tasksetsize + "/" + tasksetfile + "-" +
-                    emulator + ".dat",
-                    "w") as perffiletaskset_per_emulator_run:
-                perffiletaskset_per_emulator_run.write(
-                    taskset_per_emulator_run_stats.replace(";", " "))
+        with profilePhase("output"):
+            if stats_per_set_csv == True:
+                with open(
+                        "./log/" + tasksetsize + "/" + tasksetfile + "-" +
+                        emulator + ".csv",
+                        "w") as perffiletaskset_per_emulator_run:
+                    perffiletaskset_per_emulator_run.write(
+                        "\n".join(taskset_per_emulator_run_stats) + "\n")
+            if stats_per_set_dat == True:
+                with open(
+                        "./log/" + tasksetsize + "/" + tasksetfile + "-" +
+                        emulator + ".dat",
+                        "w") as perffiletaskset_per_emulator_run:
+                    perffiletaskset_per_emulator_run.write("\n".join(
+                        taskset_per_emulator_run_stats).replace(";", " ") +
+                                                           "\n")
 
         # print status
         counter_queue_lock.acquire()
@@ -404,993 +2732,1441 @@ def gatherThread(threadid, setstotal, counter_queue, counter_queue_lock,
     queueitem = {
         "emulator": str(emulator),
         "tasksetsize": str(tasksetsize),
-        "data": emulatordatasetsizelist
+        "data": emulatordatasetsizelist,
+        "histogram": histogram,
+        "missing": missing
     }
+    if archivefile != None:
+        archivefile.close()
     queue.put(queueitem)
+    profileWorker(slot,
+                  time.perf_counter() - threadstarttime,
+                  time.thread_time() - threadcputime)
+
+
+# header of statistics per taskset-size and summary
+def statsHeader(full):
+    header = []
+    for emulator in emulatorList():
+        for field in statsFields(full):
+            if full == True:
+                for value in ["mean", "min", "max", "stdev", "err"]:
+                    header.append(emulator + "_" + field + "_" + value)
+            else:
+                header.append(emulator + "_" + field + "_mean")
+
+    return header
+
+
+# aggregate values of a field over runs or tasksets
+def aggregateValues(field, values, full):
+    import statistics
+    if len(values) == 0:
+        if full == False:
+            return ["nan"]
+        return ["nan"] * 5
+    if full == False:
+        return [str(round(meanValue(field, values)))]
+
+    # stdev is undefined for a single run
+    valuesstdev = float("nan")
+    if len(values) > 1:
+        valuesstdev = statistics.stdev(values)
+    return [
+        str(round(meanValue(field, values))),
+        str(round(min(values))),
+        str(round(max(values))),
+        roundValue(valuesstdev),
+        roundValue(valuesstdev / len(values))
+    ]
+
+
+# rounded value as text, nan for undefined values
+def roundValue(value):
+    if math.isnan(value):
+        return "nan"
+
+    return str(round(value))
+
+
+# groups of stats_group_by as (lower, upper) over all tasksets, one per
+# distinct value or bounded by quantiles if there are more than bins values
+def groupBounds(manifest):
+    checkProperty(stats_group_by)
+    values = []
+    for tasksetsize in tasksetSizes(manifest):
+        for tasksetfile, tasksetitem in tasksetFiles(manifest, tasksetsize):
+            value = tasksetitem["properties"][stats_group_by]
+            if value != None:
+                values.append(value)
+    values.sort()
+    distinct = sorted(set(values))
+    if len(distinct) <= stats_group_bins:
+        return [(value, value) for value in distinct]
+
+    lowers = sorted(
+        set([
+            values[len(values) * i // stats_group_bins]
+            for i in range(0, stats_group_bins)
+        ]))
+    return list(zip(lowers, lowers[1:] + [values[-1]]))
+
+
+# rows of statistics per group of stats_group_by for a taskset size
+def groupRows(tasksetsize, tasksetfiles, sizedatas, bounds):
+    import bisect
+    lowers = [lower for lower, upper in bounds]
+    members = [[] for bound in bounds]
+    for tasksetfile, tasksetitem in tasksetfiles:
+        value = tasksetitem["properties"][stats_group_by]
+        if value == None or value < lowers[0]:
+            continue
+        members[bisect.bisect_right(lowers, value) - 1].append(
+            int(tasksetitem["id"]))
+
+    rows = []
+    for group in range(0, len(bounds)):
+        if len(members[group]) == 0:
+            continue
+        row = [
+            str(int(tasksetsize)),
+            str(group),
+            str(bounds[group][0]),
+            str(bounds[group][1]),
+            str(len(members[group]))
+        ]
+        for emulator in emulatorList():
+            for field in statsFields(False):
+                values = []
+                for tasksetid in members[group]:
+                    values += sizedatas[emulator][field][tasksetid]
+                row += aggregateValues(field, values, False)
+        rows.append(";".join(row))
+
+    return rows
+
+
+# write lines of statistics with given delimiter
+def writeStatistics(filename, lines, delimiter):
+    with open(filename, "w") as statsfile:
+        statsfile.write("\n".join(lines).replace(";", delimiter) + "\n")
+
+
+# downsample series by largest triangle three buckets, keeps first and last
+# value and per bucket the value forming the largest triangle with the
+# previous selected value and the mean of the next bucket
+def downsampleLttb(values, points):
+    if points < 3 or len(values) <= points:
+        return [(index, value) for index, value in enumerate(values)]
+
+    sampled = [(0, values[0])]
+    bucketsize = (len(values) - 2) / float(points - 2)
+    selected = 0
+    for bucket in range(0, points - 2):
+        nextstart = int((bucket + 1) * bucketsize) + 1
+        nextend = min(int((bucket + 2) * bucketsize) + 1, len(values))
+        nextindex = (nextstart + nextend - 1) / 2.0
+        nextvalue = sum(values[nextstart:nextend]) / (nextend - nextstart)
+
+        area = -1
+        for index in range(
+                int(bucket * bucketsize) + 1,
+                int((bucket + 1) * bucketsize) + 1):
+            candidate = abs((selected - nextindex) *
+                            (values[index] - values[selected]) -
+                            (selected - index) *
+                            (nextvalue - values[selected]))
+            if candidate > area:
+                area = candidate
+                chosen = index
+        sampled.append((chosen, values[chosen]))
+        selected = chosen
+    sampled.append((len(values) - 1, values[-1]))
+
+    return sampled
+
+
+# downsample series to min, mean and max of windows
+def downsampleMinMax(values, points):
+    windowsize = max(1, int(math.ceil(len(values) / float(points))))
+    sampled = []
+    for start in range(0, len(values), windowsize):
+        window = values[start:start + windowsize]
+        sampled.append(
+            (start, min(window), sum(window) / len(window), max(window)))
+
+    return sampled
+
+
+# write downsampled series of insert times
+def writeSeries(filename, inserttimes):
+    with profilePhase("aggregation"):
+        if stats_series == "minmax":
+            lines = ["index;min;mean;max"]
+            for start, minimum, mean, maximum in downsampleMinMax(
+                    inserttimes, stats_series_points):
+                lines.append(";".join([
+                    str(start),
+                    str(minimum),
+                    str(round(mean, 1)),
+                    str(maximum)
+                ]))
+        else:
+            lines = ["index;time"]
+            for index, value in downsampleLttb(inserttimes,
+                                               stats_series_points):
+                lines.append(str(index) + ";" + str(value))
+
+    with profilePhase("output"):
+        writeStatistics(filename, lines, " ")
+
+
+# counts of insert times per logarithmic bin, values below 1 are counted in
+# the first bin
+def runHistogram(inserttimes):
+    histogram = {}
+    for value in inserttimes:
+        binindex = int(
+            math.floor(math.log10(max(value, 1)) * stats_distribution_bins))
+        histogram[binindex] = histogram.get(binindex, 0) + 1
+
+    return histogram
+
+
+# add counts of histogram to merged histogram
+def mergeHistogram(merged, histogram):
+    for binindex, count in histogram.items():
+        merged[binindex] = merged.get(binindex, 0) + count
+
+
+# write histogram and empirical distribution function from merged counts
+def writeDistribution(emulator, tasksetsize, histogram):
+    total = sum(histogram.values())
+    if total == 0:
+        return
+
+    histogramlines = ["lower;upper;count;fraction"]
+    ecdflines = [
+        "time;fraction",
+        str(round(10**(min(histogram) / float(stats_distribution_bins)), 3)) +
+        ";0.0"
+    ]
+    cumulated = 0
+    for binindex in sorted(histogram):
+        lower = 10**(binindex / float(stats_distribution_bins))
+        upper = 10**((binindex + 1) / float(stats_distribution_bins))
+        cumulated += histogram[binindex]
+        histogramlines.append(";".join([
+            str(round(lower, 3)),
+            str(round(upper, 3)),
+            str(histogram[binindex]),
+            str(round(histogram[binindex] / float(total), 6))
+        ]))
+        ecdflines.append(
+            str(round(upper, 3)) + ";" +
+            str(round(cumulated / float(total), 6)))
+
+    writeStatistics("./log/" + tasksetsize + "-" + emulator + "-histogram.dat",
+                    histogramlines, " ")
+    writeStatistics("./log/" + tasksetsize + "-" + emulator + "-ecdf.dat",
+                    ecdflines, " ")
+
+
+# bins per power of ten of the speedup histograms of paired comparison
+paired_bins = 200
+
+
+# timer values of a log as stream, None for dropped values keeps the index
+def streamInsertTimes(logfile):
+    prefix = (log_prefix + ":").encode()
+    for line in logfile:
+        if prefix in line:
+            yield timerValue(int(line.split(b":")[1]))
+
+
+# merge neighbouring windows of aligned series
+def mergeWindows(windows):
+    merged = []
+    for i in range(0, len(windows), 2):
+        window = windows[i][:]
+        if i + 1 < len(windows):
+            window[1] += windows[i + 1][1]
+            window[2] += windows[i + 1][2]
+            window[3] = min(window[3], windows[i + 1][3])
+            window[4] = max(window[4], windows[i + 1][4])
+            window[5] += windows[i + 1][5]
+        merged.append(window)
+
+    return merged
+
+
+# stream both logs of a run, count speedups per bin and position in run
+def pairedRun(tasksetsize, tasksetfile, tasksetitem, baseline, emulator, run,
+              result):
+    # windows of start index, pairs, sum of log speedups, min, max and wins
+    windows = []
+    windowsize = 1
+    index = 0
+    with openLog(tasksetsize, tasksetfile, tasksetitem, baseline,
+                 run) as baselinefile, openLog(tasksetsize, tasksetfile,
+                                               tasksetitem, emulator,
+                                               run) as emulatorfile:
+        with profilePhase("parsing"):
+            for baselinevalue, value in zip(streamInsertTimes(baselinefile),
+                                            streamInsertTimes(emulatorfile)):
+                index += 1
+                if baselinevalue == None or value == None or \
+                    baselinevalue <= 0 or value <= 0:
+                    continue
+                speedup = baselinevalue / float(value)
+                logspeedup = math.log10(speedup)
+                binindex = int(math.floor(logspeedup * paired_bins))
+                result["histogram"][binindex] = \
+                    result["histogram"].get(binindex, 0) + 1
+
+                if len(windows) == 0 or \
+                    index - 1 >= windows[-1][0] + windowsize:
+                    if len(windows) >= 2 * stats_paired_windows:
+                        windows = mergeWindows(windows)
+                        windowsize *= 2
+                    if len(windows) == 0 or \
+                        index - 1 >= windows[-1][0] + windowsize:
+                        windows.append(
+                            [index - 1, 0, 0.0, speedup, speedup, 0])
+                window = windows[-1]
+                window[1] += 1
+                window[2] += logspeedup
+                window[3] = min(window[3], speedup)
+                window[4] = max(window[4], speedup)
+                window[5] += 1 if speedup > 1 else 0
+
+    # speedup per tenth of the run
+    for start, pairs, logsum, minimum, maximum, wins in windows:
+        position = min(9, int((start + windowsize / 2.0) * 10 / index))
+        result["positions"][position][0] += logsum
+        result["positions"][position][1] += pairs
+        result["wins"] += wins
+        result["pairs"] += pairs
+
+    lines = ["index;speedup;min;max;wins"]
+    for start, pairs, logsum, minimum, maximum, wins in windows:
+        lines.append(";".join([
+            str(start),
+            str(round(10**(logsum / pairs), 4)),
+            str(round(minimum, 4)),
+            str(round(maximum, 4)),
+            str(round(wins / float(pairs), 4))
+        ]))
+    with profilePhase("output"):
+        writeStatistics(
+            "./log/" + tasksetsize + "/" + tasksetfile + "-" + emulator + "-" +
+            str(run) + ".paired.dat", lines, " ")
+
+
+# paired comparison of all runs of one taskset size and emulator
+def pairedThread(tasksetsize, tasksetfiles, baseline, emulator, result):
+    for tasksetfile, tasksetitem in tasksetfiles:
+        for run in range(0, runsPerSet(tasksetsize)):
+            try:
+                pairedRun(tasksetsize, tasksetfile, tasksetitem, baseline,
+                          emulator, run, result)
+            except:
+                print("Error comparing " + emulator + " and " + baseline +
+                      " of " + tasksetsize + "/" + tasksetfile + "/" +
+                      str(run) + ", ignoring")
+
+
+# quantile of speedups from histogram
+def histogramQuantile(histogram, total, quantile):
+    cumulated = 0
+    for binindex in sorted(histogram):
+        cumulated += histogram[binindex]
+        if cumulated >= quantile * total:
+            return 10**((binindex + 0.5) / paired_bins)
+
+    return float("nan")
+
+
+# compare inserts of emulators with first emulator of sublist per size
+def pairedAnalysis(manifest):
+    print("\nComparing inserts of emulators ...\n")
+    results = {}
+    threads = list()
+    threadslots = list()
+    for tasksetsize in tasksetSizes(manifest):
+        for emulatorclass in emulatorClasses():
+            for emulator in emulatorclass[1:]:
+                result = {
+                    "baseline": emulatorclass[0],
+                    "histogram": {},
+                    "positions": [[0.0, 0] for i in range(0, 10)],
+                    "wins": 0,
+                    "pairs": 0
+                }
+                results[(int(tasksetsize), emulator)] = result
+                waitForThreads(threads, threadslots, number_of_threads_stats)
+                thread = threading.Thread(
+                    target=pairedThread,
+                    args=(tasksetsize, tasksetFiles(manifest, tasksetsize),
+                          emulatorclass[0], emulator, result))
+                thread.start()
+                threads.append(thread)
+                threadslots.append(len(threads))
+    waitForThreads(threads, threadslots, 1)
+
+    quantiles = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+    lines = [
+        ";".join(["size", "emulator", "baseline", "inserts", "speedup"] +
+                 ["p" + str(int(quantile * 100))
+                  for quantile in quantiles] + ["wins"] +
+                 ["position_" + str(position) for position in range(1, 11)])
+    ]
+    for tasksetsize, emulator in sorted(results):
+        result = results[(tasksetsize, emulator)]
+        if result["pairs"] == 0:
+            continue
+        logsum = sum(position[0] for position in result["positions"])
+        row = [
+            str(tasksetsize), emulator, result["baseline"],
+            str(result["pairs"]),
+            str(round(10**(logsum / result["pairs"]), 4))
+        ]
+        for quantile in quantiles:
+            row.append(
+                str(
+                    round(
+                        histogramQuantile(result["histogram"], result["pairs"],
+                                          quantile), 4)))
+        row.append(str(round(result["wins"] / float(result["pairs"]), 4)))
+        for position in result["positions"]:
+            row.append(
+                str(round(10**(position[0] /
+                               position[1]), 4)) if position[1] > 0 else "nan")
+        lines.append(";".join(row))
+        print(emulator + " vs. " + result["baseline"] + "/" +
+              str(tasksetsize) + ": speedup " + row[4] + ", median " + row[8] +
+              ", faster in " +
+              str(round(result["wins"] * 100.0 / result["pairs"], 1)) +
+              "% of inserts")
+
+    writeStatistics("./log/paired.csv", lines, ";")
+    writeStatistics("./log/paired.dat", lines, " ")
+
+    return results
+
+
+# models for scaling analysis, value of the size dependent term
+scaling_models = {
+    "constant": lambda n: 0.0,
+    "log": lambda n: math.log(n),
+    "linear": lambda n: float(n),
+    "nlogn": lambda n: n * math.log(n)
+}
+
+
+# least squares fit of value = a + b * model(size)
+def fitModel(model, sizes, values):
+    terms = [scaling_models[model](size) for size in sizes]
+    count = len(values)
+    valuesmean = sum(values) / count
+    termsmean = sum(terms) / count
+    termsvar = sum((term - termsmean)**2 for term in terms)
+    if model == "constant" or termsvar == 0:
+        a = valuesmean
+        b = 0.0
+        parameters = 1
+    else:
+        b = sum((term - termsmean) * (value - valuesmean)
+                for term, value in zip(terms, values)) / termsvar
+        a = valuesmean - b * termsmean
+        parameters = 2
+
+    residuals = sum(
+        (value - (a + b * term))**2 for term, value in zip(terms, values))
+    total = sum((value - valuesmean)**2 for value in values)
+    r2 = 1 - residuals / total if total > 0 else 1.0
+
+    # bayesian information criterion penalizes the additional parameter
+    bic = count * math.log(max(residuals / count, 1e-12)) + \
+        parameters * math.log(count)
+
+    return {"a": a, "b": b, "r2": r2, "bic": bic}
+
+
+# value of fitted model at given size
+def modelValue(model, fit, size):
+    return fit["a"] + fit["b"] * scaling_models[model](size)
+
+
+# smallest size where emulator is faster than baseline according to fits
+def crossoverSize(baselinemodel, baselinefit, model, fit, startsize):
+    difference = lambda size: modelValue(model, fit, size) - modelValue(
+        baselinemodel, baselinefit, size)
+    if difference(startsize) < 0:
+        return startsize
+
+    # scan logarithmic grid, then refine sign change with bisection
+    steps = 1000
+    lower = startsize
+    for step in range(1, steps + 1):
+        upper = startsize * (stats_scaling_max_size /
+                             startsize)**(step / float(steps))
+        if difference(upper) < 0:
+            for i in range(0, 50):
+                middle = (lower + upper) / 2
+                if difference(middle) < 0:
+                    upper = middle
+                else:
+                    lower = middle
+            return upper
+        lower = upper
+
+    return None
+
+
+# fit scaling models per emulator and write results and curves
+def scalingAnalysis(scalingdata):
+    results = {}
+    lines = ["emulator;model;a;b;r2;bic;best"]
+    for emulator in emulatorList():
+        sizes = [size for size, value in scalingdata[emulator]]
+        values = [value for size, value in scalingdata[emulator]]
+        if len(sizes) < 2:
+            print("Scaling analysis of " + emulator +
+                  " needs at least two taskset sizes, skipping")
+            continue
+
+        fits = {}
+        for model in scaling_models:
+            fits[model] = fitModel(model, sizes, values)
+        # two sizes are fitted exactly by every model with two parameters
+        best = None
+        if len(set(sizes)) >= 3:
+            best = min(fits, key=lambda model: fits[model]["bic"])
+        results[emulator] = {"sizes": sizes, "fits": fits, "best": best}
+        for model in scaling_models:
+            lines.append(";".join([
+                emulator, model,
+                str(round(fits[model]["a"], 4)),
+                str(round(fits[model]["b"], 6)),
+                str(round(fits[model]["r2"], 4)),
+                str(round(fits[model]["bic"], 2)),
+                str(int(model == best))
+            ]))
+        if best == None:
+            print("Scaling of " + emulator + ": underdetermined, at least " +
+                  "three taskset sizes are needed to rank the models")
+        else:
+            print("Scaling of " + emulator + ": best fit " + best + " (r2 " +
+                  str(round(fits[best]["r2"], 4)) + ")")
+
+        # fit curves from smallest size up to maximum size
+        curve = ["size;measured;" + ";".join(scaling_models)]
+        measured = dict(scalingdata[emulator])
+        points = set(sizes)
+        for step in range(0, stats_scaling_points):
+            points.add(sizes[0] * (stats_scaling_max_size / sizes[0])
+                       **(step / float(stats_scaling_points - 1)))
+        for size in sorted(points):
+            row = [str(round(size, 3))]
+            row.append(
+                str(round(measured[size], 3)) if size in measured else "nan")
+            for model in scaling_models:
+                row.append(str(round(modelValue(model, fits[model], size), 3)))
+            curve.append(";".join(row))
+        writeStatistics("./log/scaling-" + emulator + ".dat", curve, " ")
+
+    # crossover of every emulator with the first one of its sublist
+    lines.append("")
+    lines.append("baseline;emulator;baseline_model;model;crossover_size")
+    for emulatorclass in emulatorClasses():
+        baseline = emulatorclass[0]
+        for emulator in emulatorclass[1:]:
+            if baseline not in results or emulator not in results:
+                continue
+            baselinemodel = results[baseline]["best"]
+            model = results[emulator]["best"]
+            if baselinemodel == None or model == None:
+                lines.append(";".join(
+                    [baseline, emulator, "none", "none", "nan"]))
+                print("Crossover " + emulator + " vs. " + baseline +
+                      ": underdetermined")
+                continue
+            crossover = crossoverSize(baselinemodel,
+                                      results[baseline]["fits"][baselinemodel],
+                                      model, results[emulator]["fits"][model],
+                                      min(results[emulator]["sizes"]))
+            lines.append(";".join([
+                baseline, emulator, baselinemodel, model,
+                str(round(crossover, 1)) if crossover != None else "nan"
+            ]))
+            print("Crossover " + emulator + " vs. " + baseline + ": " +
+                  (str(round(crossover, 1)) if crossover !=
+                   None else "none up to " + str(stats_scaling_max_size)))
+
+    writeStatistics("./log/scaling.csv", lines, ";")
+    writeStatistics("./log/scaling.dat", lines, " ")
+
+    return results
+
+
+# open history database and create tables
+def historyOpen():
+    import sqlite3
+    historydir = os.path.dirname(stats_history_file)
+    if historydir != "":
+        os.makedirs(historydir, exist_ok=True)
+    connection = sqlite3.connect(stats_history_file)
+    connection.executescript("""
+        CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY,
+            created TEXT, host TEXT, platform TEXT, runs_per_set INTEGER);
+        CREATE TABLE IF NOT EXISTS emulators (run INTEGER, emulator TEXT,
+            hash TEXT);
+        CREATE TABLE IF NOT EXISTS sizes (run INTEGER, emulator TEXT,
+            size INTEGER, field TEXT, value REAL);
+        CREATE TABLE IF NOT EXISTS tasksets (run INTEGER, emulator TEXT,
+            size INTEGER, taskset INTEGER, field TEXT, value REAL);
+        CREATE INDEX IF NOT EXISTS tasksets_run ON tasksets (run, field);
+    """)
+    return connection
+
+
+# fields whose means per taskset are stored in history, the compare_field
+# and the fields of the statistics per taskset size
+def historyFields():
+    fields = statsFields(False)
+    if compare_field not in fields and compare_field in statsFields(True):
+        fields.append(compare_field)
+
+    return fields
+
+
+# append means per taskset and per taskset size to history
+def historyStore(tasksetdata, summarydata):
+    import platform
+    connection = historyOpen()
+    with connection:
+        cursor = connection.execute(
+            "INSERT INTO runs (created, host, platform, runs_per_set) " +
+            "VALUES (?, ?, ?, ?)",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), platform.node(),
+             platform.platform(), runs_emulation_per_set))
+        historyid = cursor.lastrowid
+        for emulator in emulatorList():
+            try:
+                binaryhash = emulatorHash(emulator)
+            except:
+                binaryhash = None
+            connection.execute("INSERT INTO emulators VALUES (?, ?, ?)",
+                               (historyid, emulator, binaryhash))
+            for tasksetsize in summarydata[emulator]:
+                sizedata = tasksetdata[emulator][tasksetsize]
+                for field in summarydata[emulator][tasksetsize]:
+                    connection.execute(
+                        "INSERT INTO sizes VALUES (?, ?, ?, ?, ?)",
+                        (historyid, emulator, tasksetsize, field,
+                         summarydata[emulator][tasksetsize][field]))
+                for field in sizedata:
+                    connection.executemany(
+                        "INSERT INTO tasksets VALUES (?, ?, ?, ?, ?, ?)",
+                        [(historyid, emulator, tasksetsize, tasksetid, field,
+                          value)
+                         for tasksetid, value in sizedata[field].items()
+                         if math.isnan(value) == False])
+    connection.close()
+    print("\nStatistics added to " + stats_history_file + " as run " +
+          str(historyid))
+
+    return historyid
+
+
+# regularized incomplete beta function, continued fraction by modified Lentz
+def incompleteBeta(x, a, b):
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - incompleteBeta(1 - x, b, a)
+
+    front = math.exp(
+        math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) +
+        a * math.log(x) + b * math.log(1 - x)) / a
+    c = 1.0
+    d = 1.0 / max(abs(1.0 - (a + b) * x / (a + 1)), 1e-30)
+    result = d
+    for m in range(1, 300):
+        for numerator in [
+                m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))
+        ]:
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > 1e-30 else 1e-30)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > 1e-30 else 1e-30
+            result *= d * c
+        if abs(d * c - 1.0) < 1e-12:
+            break
+
+    return front * result
+
+
+# two-sided p-value of t statistic
+def tTestPValue(t, df):
+    return incompleteBeta(df / (df + t * t), df / 2.0, 0.5)
+
+
+# test of logarithmic values, paired by taskset if possible, otherwise welch
+def compareValues(baseline, current):
+    import statistics
+    pairs = [
+        math.log(current[tasksetid]) - math.log(baseline[tasksetid])
+        for tasksetid in baseline if tasksetid in current
+        and baseline[tasksetid] > 0 and current[tasksetid] > 0
+    ]
+    if len(pairs) >= 2 and len(pairs) == len(baseline) == len(current):
+        meandiff = sum(pairs) / len(pairs)
+        stderr = statistics.stdev(pairs) / math.sqrt(len(pairs))
+        df = len(pairs) - 1
+        test = "paired"
+    else:
+        logbaseline = [math.log(value) for value in baseline.values()]
+        logcurrent = [math.log(value) for value in current.values()]
+        if len(logbaseline) < 2 or len(logcurrent) < 2:
+            return None
+        meandiff = sum(logcurrent) / len(logcurrent) - \
+            sum(logbaseline) / len(logbaseline)
+        varbaseline = statistics.variance(logbaseline) / len(logbaseline)
+        varcurrent = statistics.variance(logcurrent) / len(logcurrent)
+        stderr = math.sqrt(varbaseline + varcurrent)
+        if stderr > 0:
+            df = (varbaseline +
+                  varcurrent)**2 / (varbaseline**2 /
+                                    (len(logbaseline) - 1) + varcurrent**2 /
+                                    (len(logcurrent) - 1))
+        else:
+            df = 1
+        test = "welch"
+
+    if stderr > 0:
+        pvalue = tTestPValue(meandiff / stderr, df)
+    else:
+        pvalue = 0.0 if meandiff != 0 else 1.0
+
+    return {"change": math.exp(meandiff) - 1, "p": pvalue, "test": test}
+
+
+# critical value of t distribution for two-sided confidence level
+def tQuantile(level, df):
+    lower = 0.0
+    upper = 1000.0
+    for i in range(0, 100):
+        middle = (lower + upper) / 2
+        if tTestPValue(middle, df) > 1 - level:
+            lower = middle
+        else:
+            upper = middle
+
+    return upper
+
+
+# geometric mean and 95% confidence interval of positive values
+def logConfidence(values):
+    import statistics
+    logvalues = [math.log(value) for value in values]
+    mean = sum(logvalues) / len(logvalues)
+    if len(logvalues) < 2:
+        return math.exp(mean), float("nan"), float("nan")
+    margin = tQuantile(0.95, len(logvalues) - 1) * \
+        statistics.stdev(logvalues) / math.sqrt(len(logvalues))
+
+    return math.exp(mean), math.exp(mean - margin), math.exp(mean + margin)
+
+
+# open log of a run as binary file, from logfile, archive or result cache
+def openLog(tasksetsize, tasksetfile, tasksetitem, emulator, run):
+    import gzip
+    import io
+    logfilename = "./log/" + tasksetsize + "/" + tasksetfile + "-" + \
+        emulator + "-" + str(run) + logExtension()
+    record = archiveIndex(tasksetsize, emulator).get((tasksetfile, run))
+    if os.path.isfile(logfilename) == False and record != None:
+        with open(archiveFilename(tasksetsize, emulator), "rb") as archivefile:
+            archivefile.seek(record["offset"])
+            data = archivefile.read(record["length"])
+        return gzip.GzipFile(fileobj=io.BytesIO(data))
+
+    logfilename = resolveLogfile(logfilename, tasksetsize, tasksetitem,
+                                 emulator, run)
+    if logfilename.endswith(".gz"):
+        return gzip.open(logfilename, "rb")
+    return open(logfilename, "rb")
+
+
+# reservoir sample of timer values of the beginning of a log
+def sampleInsertTimes(logfile, generator):
+    prefix = (log_prefix + ":").encode()
+    samples = []
+    seen = 0
+    bytesread = 0
+    for line in logfile:
+        bytesread += len(line)
+        if bytesread > preview_max_bytes:
+            break
+        if prefix not in line:
+            continue
+        timeneeded = timerValue(int(line.split(b":")[1]))
+        if timeneeded == None:
+            continue
+        seen += 1
+        if len(samples) < preview_samples:
+            samples.append(timeneeded)
+        else:
+            replace = generator.randrange(0, seen)
+            if replace < preview_samples:
+                samples[replace] = timeneeded
+
+    return samples
+
+
+# approximate per-insert time per taskset size from a sample of the logs
+def previewStatistics():
+    import random
+    import statistics
+    manifest = filterManifest(loadTasksetManifest())
+    print("\nPreview of " + str(preview_tasksets) + " tasksets and " +
+          str(preview_runs) + " runs per taskset size, " +
+          str(preview_samples) + " samples of at most " +
+          str(preview_max_bytes) + " bytes per log\n")
+
+    preview = {}
+    for tasksetsize in tasksetSizes(manifest):
+        generator = random.Random(str(preview_seed) + ":" + tasksetsize)
+        tasksetfiles = tasksetFiles(manifest, tasksetsize)
+        tasksetfiles = generator.sample(
+            tasksetfiles, min(preview_tasksets, len(tasksetfiles)))
+        runs = generator.sample(range(0, runsPerSet(tasksetsize)),
+                                min(preview_runs, runsPerSet(tasksetsize)))
+
+        # per-insert time of sampled runs by taskset and run
+        values = {}
+        for emulator in emulatorList():
+            values[emulator] = {}
+            for tasksetfile, tasksetitem in tasksetfiles:
+                for run in runs:
+                    try:
+                        with openLog(tasksetsize, tasksetfile, tasksetitem,
+                                     emulator, run) as logfile:
+                            samples = sampleInsertTimes(
+                                logfile,
+                                random.Random(
+                                    str(preview_seed) + ":" + tasksetsize +
+                                    ":" + tasksetfile + ":" + emulator + ":" +
+                                    str(run)))
+                        values[emulator][(tasksetfile, run)] = \
+                            statistics.geometric_mean(samples)
+                    except:
+                        pass
+
+        preview[int(tasksetsize)] = {}
+        print("Size " + tasksetsize + ":")
+        for emulator in emulatorList():
+            if len(values[emulator]) == 0:
+                print("  " + emulator + ": no logs found")
+                continue
+            mean, lower, upper = logConfidence(list(values[emulator].values()))
+            preview[int(tasksetsize)][emulator] = {
+                "time_perinsert": mean,
+                "lower": lower,
+                "upper": upper,
+                "runs": len(values[emulator])
+            }
+            print("  " + emulator + ": " + str(round(mean)) +
+                  " per insert (95% CI " + roundValue(lower) + " - " +
+                  roundValue(upper) + ", " + str(len(values[emulator])) +
+                  " runs)")
+
+        # ratio against first emulator of sublist, paired by taskset and run
+        for emulatorclass in emulatorClasses():
+            baseline = emulatorclass[0]
+            for emulator in emulatorclass[1:]:
+                ratios = [
+                    values[emulator][job] / values[baseline][job]
+                    for job in values[emulator] if job in values[baseline]
+                ]
+                if len(ratios) == 0:
+                    continue
+                mean, lower, upper = logConfidence(ratios)
+                preview[int(tasksetsize)][emulator]["ratio"] = {
+                    "baseline": baseline,
+                    "ratio": mean,
+                    "lower": lower,
+                    "upper": upper
+                }
+                print("  " + emulator + " vs. " + baseline + ": " +
+                      str(round((mean - 1) * 100, 1)) + "% (95% CI " +
+                      str(round((lower - 1) * 100, 1)) + "% - " +
+                      str(round((upper - 1) * 100, 1)) + "%)")
+
+    return preview
+
+
+# between-taskset and between-run variance of groups of values by one-way
+# analysis of variance, sums are accumulated in one pass
+def varianceComponents(groups):
+    groups = [group for group in groups if len(group) > 0]
+    count = 0
+    total = 0.0
+    squares = 0.0
+    groupterm = 0.0
+    groupsizes = 0
+    for group in groups:
+        groupsum = 0.0
+        for value in group:
+            groupsum += value
+            squares += value * value
+        count += len(group)
+        total += groupsum
+        groupterm += groupsum * groupsum / len(group)
+        groupsizes += len(group) * len(group)
+    if len(groups) < 2 or count <= len(groups):
+        return None
+
+    between = (groupterm - total * total / count) / (len(groups) - 1)
+    within = (squares - groupterm) / (count - len(groups))
+    groupsize = (count - groupsizes / float(count)) / (len(groups) - 1)
+
+    return {
+        "between": max(0.0, (between - within) / groupsize),
+        "within": max(0.0, within)
+    }
+
+
+# tasksets and runs per taskset size minimizing the standard error of the
+# mean per-insert time within a time budget, from existing logs
+def planRuns(budget):
+    quiet = Configuration(stats_per_set_csv=False,
+                          stats_per_set_dat=False,
+                          stats_per_size_csv=False,
+                          stats_per_size_dat=False,
+                          stats_per_size_csv_full=False,
+                          stats_per_size_dat_full=False,
+                          stats_overall_csv=False,
+                          stats_overall_dat=False,
+                          stats_overall_csv_full=False,
+                          stats_overall_dat_full=False,
+                          stats_scaling=False,
+                          stats_series="",
+                          stats_distribution=False,
+                          stats_history=False,
+                          stats_keep_data=True,
+                          profile_report=False,
+                          profile_cprofile_phase="")
+    with useConfiguration(quiet):
+        statsdata = gatherStatistics()["data"]
+    manifest = loadTasksetManifest()
+    tasksetsizes = tasksetSizes(manifest)
+    if len(tasksetsizes) == 0:
+        raise EmulationError("Error finding tasksets to plan")
+
+    # budget is shared equally by sizes and used by all emulation threads
+    sizebudget = budget * number_of_threads_emulation / len(tasksetsizes)
+    print("\nPlanning " + str(budget) + " seconds with " +
+          str(number_of_threads_emulation) + " emulation threads\n")
+    plan = {"budget": budget, "sizes": {}}
+    for tasksetsize in tasksetsizes:
+        available = len(tasksetFiles(manifest, tasksetsize, False))
+        components = {}
+        runcost = 0.0
+        for emulator in emulatorList():
+            sizedata = statsdata[emulator][tasksetsize]
+            components[emulator] = varianceComponents(
+                [[math.log(value) for value in values]
+                 for values in sizedata["time_perinsert_mean"].values()])
+            walltimes = [
+                usage["time_wall"] for usages in sizedata["rusage"].values()
+                for usage in usages if usage != None and "time_wall" in usage
+            ]
+            if components[emulator] == None or len(walltimes) == 0:
+                components = None
+                break
+            runcost += sum(walltimes) / len(walltimes)
+        if components == None:
+            print("Size " + tasksetsize + ": not enough tasksets, runs or " +
+                  "resource usage to plan")
+            continue
+
+        # optimal runs per taskset of nested design, with sums over emulators
+        between = sum(item["between"] for item in components.values())
+        within = sum(item["within"] for item in components.values())
+        if between > 0 and plan_taskset_cost > 0:
+            runs = max(
+                plan_min_runs,
+                int(
+                    round(
+                        math.sqrt(plan_taskset_cost * within /
+                                  (runcost * between)))))
+        else:
+            runs = plan_min_runs
+        tasksets = int(sizebudget // (plan_taskset_cost + runs * runcost))
+        if tasksets > available:
+            # all tasksets are used, remaining budget goes into runs
+            tasksets = available
+            runs = max(
+                runs,
+                int((sizebudget / available - plan_taskset_cost) // runcost))
+        tasksets = max(1, tasksets)
+
+        plan["sizes"][tasksetsize] = {"tasksets": tasksets, "runs": runs}
+        print(
+            "Size " + tasksetsize + ": " + str(tasksets) + " of " +
+            str(available) + " tasksets with " + str(runs) + " runs, " + str(
+                round(tasksets * runs * runcost /
+                      number_of_threads_emulation, 1)) + " seconds")
+        for emulator in emulatorList():
+            variance = components[emulator]["between"] / tasksets + \
+                components[emulator]["within"] / (tasksets * runs)
+            plan["sizes"][tasksetsize][emulator] = {
+                "variance_between": components[emulator]["between"],
+                "variance_within": components[emulator]["within"],
+                "stderr": math.exp(math.sqrt(variance)) - 1
+            }
+            print(
+                "  " + emulator + ": between-taskset " +
+                str(round(math.sqrt(components[emulator]["between"]) *
+                          100, 2)) + "%, between-run " +
+                str(round(math.sqrt(components[emulator]["within"]) *
+                          100, 2)) + "%, expected standard error " +
+                str(
+                    round(plan["sizes"][tasksetsize][emulator]["stderr"] *
+                          100, 2)) + "%")
+
+    plandir = os.path.dirname(plan_file)
+    if plandir != "":
+        os.makedirs(plandir, exist_ok=True)
+    with open(plan_file, "w") as planfile:
+        json.dump(plan, planfile, indent=2, sort_keys=True)
+    print("\nPlan written to " + plan_file + ", set emulation_plan = True " +
+          "to use it")
+
+    return plan
+
+
+# compare two stats runs of history, by default the last two
+def compareHistory(baseline=None, current=None):
+    connection = historyOpen()
+    historyids = [
+        row[0] for row in connection.execute("SELECT id FROM runs ORDER BY id")
+    ]
+    if current == None and len(historyids) > 0:
+        current = historyids[-1]
+    if baseline == None and len(historyids) > 1:
+        baseline = historyids[-2]
+    if baseline not in historyids or current not in historyids:
+        connection.close()
+        raise EmulationError("Error finding runs to compare in " +
+                             stats_history_file)
+
+    values = {}
+    hashes = {}
+    for historyid in [baseline, current]:
+        values[historyid] = {}
+        for emulator, tasksetsize, tasksetid, value in connection.execute(
+                "SELECT emulator, size, taskset, value FROM tasksets " +
+                "WHERE run = ? AND field = ?", (historyid, compare_field)):
+            values[historyid].setdefault((emulator, tasksetsize),
+                                         {})[tasksetid] = value
+        hashes[historyid] = dict(
+            connection.execute(
+                "SELECT emulator, hash FROM emulators WHERE run = ?",
+                (historyid, )))
+    connection.close()
+
+    print("\nComparing " + compare_field + " of run " + str(current) +
+          " against baseline " + str(baseline) + "\n")
+    comparison = {"results": [], "regressions": [], "improvements": []}
+    for emulator, tasksetsize in sorted(values[baseline]):
+        if (emulator, tasksetsize) not in values[current]:
+            continue
+        result = compareValues(values[baseline][(emulator, tasksetsize)],
+                               values[current][(emulator, tasksetsize)])
+        if result == None:
+            continue
+
+        result.update({
+            "emulator":
+            emulator,
+            "size":
+            tasksetsize,
+            "rebuilt":
+            hashes[baseline].get(emulator) != hashes[current].get(emulator)
+        })
+        verdict = "unchanged"
+        if result["p"] < compare_alpha and \
+            abs(result["change"]) >= compare_min_change:
+            if result["change"] > 0:
+                verdict = "regression"
+                comparison["regressions"].append(result)
+            else:
+                verdict = "improvement"
+                comparison["improvements"].append(result)
+        result["verdict"] = verdict
+        comparison["results"].append(result)
+        print(emulator + "/" + str(tasksetsize) + ": " +
+              ("+" if result["change"] >= 0 else "") +
+              str(round(result["change"] * 100, 2)) + "% (p " +
+              str(round(result["p"], 4)) + ", " + result["test"] +
+              (", rebuilt" if result["rebuilt"] == True else "") + ") " +
+              verdict)
+
+    print("\n" + str(len(comparison["regressions"])) + " regressions, " +
+          str(len(comparison["improvements"])) + " improvements")
+
+    return comparison
+
+
+# fields of the means per taskset size, all fields only if they are written
+# or kept
+def summaryFields():
+    if stats_per_size_csv_full == True or stats_per_size_dat_full == True or \
+        stats_overall_csv_full == True or stats_overall_dat_full == True or \
+        stats_keep_data == True:
+        return statsFields(True)
+
+    return statsFields(False)
+
+
+# aggregate and write statistics of a taskset size, keeps only the summary
+# rows, means and per-taskset means for scaling, groups and history
+def finalizeSize(manifest, tasksetsize, sizedatas, finished):
+    per_size_full = stats_per_size_csv_full == True or \
+        stats_per_size_dat_full == True
+    per_size = stats_per_size_csv == True or stats_per_size_dat == True
+    overall_full = stats_overall_csv_full == True or \
+        stats_overall_dat_full == True
+    overall = stats_overall_csv == True or stats_overall_dat == True
+    with profilePhase("aggregation"):
+        tasksetstats_text_full = [";".join(["size", "id"] + statsHeader(True))]
+        tasksetstats_text = [";".join(["size", "id"] + statsHeader(False))]
+        tasksetnames = {
+            int(tasksetitem["id"]): tasksetitem["id"]
+            for tasksetfile, tasksetitem in tasksetFiles(
+                manifest, tasksetsize)
+        }
+        tasksetids = sorted(sizedatas[emulatorList()[0]]['ids'])
+
+        # one line per taskset
+        for tasksetid in tasksetids:
+            row_full = [str(int(tasksetsize)), tasksetnames[tasksetid]]
+            row = row_full[:]
+            for emulator in emulatorList():
+                sizedata = sizedatas[emulator]
+                if per_size_full == True:
+                    for field in statsFields(True):
+                        row_full += aggregateValues(field,
+                                                    sizedata[field][tasksetid],
+                                                    True)
+                if per_size == True:
+                    for field in statsFields(False):
+                        row += aggregateValues(field,
+                                               sizedata[field][tasksetid],
+                                               False)
+            tasksetstats_text_full.append(";".join(row_full))
+            tasksetstats_text.append(";".join(row))
+
+        # append means per taskset-size, these are also the summary
+        row_full = [str(int(tasksetsize)), "mean"]
+        row = row_full[:]
+        summary_full = [str(int(tasksetsize)), str(len(tasksetids))]
+        summary = summary_full[:]
+        for emulator in emulatorList():
+            sizedata = sizedatas[emulator]
+            finished["summary"][emulator][int(tasksetsize)] = {}
+            for field in summaryFields():
+                finished["summary"][emulator][int(tasksetsize)][field] = \
+                    meanValue(field, mergeSublists(sizedata[field]))
+            if stats_history == True:
+                finished["tasksets"][emulator][int(tasksetsize)] = {
+                    field: {
+                        tasksetid: meanValue(field, values)
+                        for tasksetid, values in sizedata[field].items()
+                    }
+                    for field in historyFields()
+                }
+            if per_size_full == True or overall_full == True:
+                for field in statsFields(True):
+                    values = aggregateValues(field,
+                                             mergeSublists(sizedata[field]),
+                                             True)
+                    row_full += values
+                    summary_full += values
+            if per_size == True or overall == True:
+                for field in statsFields(False):
+                    values = aggregateValues(field,
+                                             mergeSublists(sizedata[field]),
+                                             False)
+                    row += values
+                    summary += values
+        tasksetstats_text_full.append(";".join(row_full))
+        tasksetstats_text.append(";".join(row))
+        finished["overall_full"][int(tasksetsize)] = ";".join(summary_full)
+        finished["overall"][int(tasksetsize)] = ";".join(summary)
+
+        # statistics per group of taskset property
+        if stats_group_by != "":
+            finished["groups"][int(tasksetsize)] = groupRows(
+                tasksetsize, tasksetFiles(manifest, tasksetsize), sizedatas,
+                finished["groupbounds"])
+
+    with profilePhase("output"):
+        if stats_per_size_csv_full == True:
+            writeStatistics("./log/" + tasksetsize + "-full.csv",
+                            tasksetstats_text_full, ";")
+        if stats_per_size_dat_full == True:
+            writeStatistics("./log/" + tasksetsize + "-full.dat",
+                            tasksetstats_text_full, " ")
+        if stats_per_size_csv == True:
+            writeStatistics("./log/" + tasksetsize + ".csv", tasksetstats_text,
+                            ";")
+        if stats_per_size_dat == True:
+            writeStatistics("./log/" + tasksetsize + ".dat", tasksetstats_text,
+                            " ")
+    print("Statistics of taskset size " + tasksetsize + " written")
+
+
+# write missing runs to errors.json, tasksets without any run of an emulator
+# are listed separately as all their values are nan
+def writeErrorReport(missing, runstotal):
+    missing.sort(key=lambda item: (item["size"], item["emulator"], item[
+        "taskset"], item["run"]))
+    counts = {}
+    for item in missing:
+        key = (item["size"], item["emulator"], item["taskset"])
+        counts[key] = counts.get(key, 0) + 1
+    report = {
+        "created":
+        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "runs_total":
+        runstotal,
+        "runs_missing":
+        len(missing),
+        "tasksets_without_runs": [{
+            "size": size,
+            "emulator": emulator,
+            "taskset": tasksetfile
+        } for (size, emulator, tasksetfile), count in counts.items()
+                                  if count >= runsPerSet(str(size))],
+        "missing":
+        missing
+    }
+    with open("./log/errors.json", "w") as reportfile:
+        json.dump(report, reportfile, indent=1)
+    if len(missing) > 0:
+        print("\n" + str(len(missing)) + " of " + str(runstotal) +
+              " runs missing, see log/errors.json")
+
+
+# move gathered data from queue, finalize taskset sizes whose emulators are
+# all gathered and release their data
+def collectGathered(gatherqueue, manifest, finished):
+    while gatherqueue.qsize() > 0:
+        queueitem = gatherqueue.get()
+        tasksetsize = str(queueitem["tasksetsize"])
+        if stats_distribution == True:
+            with profilePhase("output"):
+                writeDistribution(queueitem["emulator"], tasksetsize,
+                                  queueitem["histogram"])
+        finished["missing"] += queueitem["missing"]
+        sizedatas = finished["gathering"].setdefault(tasksetsize, {})
+        sizedatas[queueitem["emulator"]] = queueitem["data"]
+        if len(sizedatas) < len(emulatorList()):
+            continue
+
+        del finished["gathering"][tasksetsize]
+        finalizeSize(manifest, tasksetsize, sizedatas, finished)
+        if stats_keep_data == True:
+            for emulator in emulatorList():
+                finished["data"][emulator][tasksetsize] = sizedatas[emulator]
 
 
 # gather statistics
 def gatherStatistics():
-    fulldata = {}
     print("\nGathering statistics ...\n")
-    # prepare whole dataset
-    taskset_per_size_stats_full = "size;id;"
-    taskset_per_size_stats = "size;id;"
-    taskset_overall_stats_full = "size;sets;"
-    taskset_overall_stats = "size;sets;"
-    statsheader = ""
-    statsheader_full = ""
-
-    # create main statistic header
-    for emulatorclass in emulators:
-        for emulator in emulatorclass:
-            statsheader_full += str(emulator) + "_inserts_mean;"
-            statsheader_full += str(emulator) + "_inserts_min;"
-            statsheader_full += str(emulator) + "_inserts_max;"
-            statsheader_full += str(emulator) + "_inserts_stdev;"
-            statsheader_full += str(emulator) + "_inserts_err;"
-            statsheader_full += str(emulator) + "_time_total_mean;"
-            statsheader_full += str(emulator) + "_time_total_min;"
-            statsheader_full += str(emulator) + "_time_total_max;"
-            statsheader_full += str(emulator) + "_time_total_stdev;"
-            statsheader_full += str(emulator) + "_time_total_err;"
-            statsheader_full += str(emulator) + "_time_perinsert_mean_mean;"
-            statsheader_full += str(emulator) + "_time_perinsert_mean_min;"
-            statsheader_full += str(emulator) + "_time_perinsert_mean_max;"
-            statsheader_full += str(emulator) + "_time_perinsert_mean_stdev;"
-            statsheader_full += str(emulator) + "_time_perinsert_mean_err;"
-            statsheader_full += str(emulator) + "_time_perinsert_min_mean;"
-            statsheader_full += str(emulator) + "_time_perinsert_min_min;"
-            statsheader_full += str(emulator) + "_time_perinsert_min_max;"
-            statsheader_full += str(emulator) + "_time_perinsert_min_stdev;"
-            statsheader_full += str(emulator) + "_time_perinsert_min_err;"
-            statsheader_full += str(emulator) + "_time_perinsert_max_mean;"
-            statsheader_full += str(emulator) + "_time_perinsert_max_min;"
-            statsheader_full += str(emulator) + "_time_perinsert_max_max;"
-            statsheader_full += str(emulator) + "_time_perinsert_max_stdev;"
-            statsheader_full += str(emulator) + "_time_perinsert_max_err;"
-            statsheader_full += str(emulator) + "_time_perinsert_stdev_mean;"
-            statsheader_full += str(emulator) + "_time_perinsert_stdev_min;"
-            statsheader_full += str(emulator) + "_time_perinsert_stdev_max;"
-            statsheader_full += str(emulator) + "_time_perinsert_stdev_stdev;"
-            statsheader_full += str(emulator) + "_time_perinsert_stdev_err;"
-            statsheader_full += str(emulator) + "_time_perinsert_err_mean;"
-            statsheader_full += str(emulator) + "_time_perinsert_err_min;"
-            statsheader_full += str(emulator) + "_time_perinsert_err_max;"
-            statsheader_full += str(emulator) + "_time_perinsert_err_stdev;"
-            statsheader_full += str(emulator) + "_time_perinsert_err_err;"
-
-            statsheader += str(emulator) + "_inserts_mean;"
-            statsheader += str(emulator) + "_time_total_mean;"
-            statsheader += str(emulator) + "_time_perinsert_mean_mean;"
-            statsheader += str(emulator) + "_time_perinsert_stdev_mean;"
-
-            # add list per emulator to fulldata
-            emulatordata = {}
-            fulldata[str(emulator)] = emulatordata
-
-    # replace last ";" with "\n"
-    statsheader_full = statsheader_full[:-1] + "\n"
-    statsheader = statsheader[:-1] + "\n"
-
-    # now concetenate full headers
-    taskset_per_size_stats_full += statsheader_full
-    taskset_per_size_stats += statsheader
-    taskset_overall_stats_full += statsheader_full
-    taskset_overall_stats += statsheader
+    profileReset()
+    archive_indexes.clear()
+    statsstarttime = time.perf_counter()
+
+    # results of finalized taskset sizes
+    finished = {
+        "gathering": {},
+        "data": {},
+        "summary": {},
+        "tasksets": {},
+        "overall_full": {},
+        "overall": {},
+        "groups": {},
+        "missing": []
+    }
+    for emulator in emulatorList():
+        finished["data"][emulator] = {}
+        finished["summary"][emulator] = {}
+        finished["tasksets"][emulator] = {}
 
     # threaded collection of all stats
     threadid = 0
     threads = list()
 
-    # queue for results
+    # queue for results and exceptions of threads
     gatherqueue = queue.Queue()
+    errors = []
 
     # queue and semaphore for jobcounter
     counter_queue_lock = threading.Semaphore()
     counter_queue = queue.Queue()
     counter_queue.put(0)
     setstotal = 0
+    runstotal = 0
 
     # count total sets
-    for tasksetsize_item in os.walk("tasksets"):
-        tasksetpath = tasksetsize_item[0]
-        if (tasksetpath != "tasksets"):
-            tasksetsize = tasksetpath.split("/")[1]
-            for emulatorclass in emulators:
-                for emulator in emulatorclass:
-                    setstotal += len(os.listdir(tasksetpath))
+    with profilePhase("discovery"):
+        manifest = filterManifest(loadTasksetManifest())
+        if stats_group_by != "":
+            finished["groupbounds"] = groupBounds(manifest)
+        for tasksetsize in tasksetSizes(manifest):
+            for emulator in emulatorList():
+                setstotal += len(tasksetFiles(manifest, tasksetsize))
+                runstotal += len(tasksetFiles(
+                    manifest, tasksetsize)) * runsPerSet(tasksetsize)
 
+    threadslots = list()
     starttime = datetime.now()
-    for tasksetsize_item in os.walk("tasksets"):
-        tasksetpath = tasksetsize_item[0]
-        if (tasksetpath != "tasksets"):
-            tasksetsize = tasksetpath.split("/")[1]
-            for emulatorclass in emulators:
-                for emulator in emulatorclass:
-                    # here we do threading
-                    while len(threads) >= number_of_threads_stats:
-                        for i in range(0, len(threads)):
-                            if threads[i].is_alive() == False:
-                                threads[i].join()
-                                threads.pop(i)
-                                break
-                        time.sleep(0.01)
-
-                    thread = threading.Thread(target=gatherThread,
-                                              args=(
-                                                  threadid,
-                                                  setstotal,
-                                                  counter_queue,
-                                                  counter_queue_lock,
-                                                  starttime,
-                                                  emulator,
-                                                  tasksetsize,
-                                                  tasksetpath,
-                                                  gatherqueue,
-                                              ))
-                    thread.start()
-                    threads.append(thread)
-                    threadid += 1
-
-    # here we wait for all threads to end collect data
+    for tasksetsize in tasksetSizes(manifest):
+        tasksetfiles = tasksetFiles(manifest, tasksetsize)
+        for emulator in emulatorList():
+            # here we do threading
+            while len(threads) >= number_of_threads_stats:
+                for i in range(0, len(threads)):
+                    if threads[i].is_alive() == False:
+                        threads[i].join()
+                        threads.pop(i)
+                        threadslots.pop(i)
+                        break
+                if len(errors) == 0:
+                    collectGathered(gatherqueue, manifest, finished)
+                time.sleep(0.01)
+
+            if len(errors) > 0:
+                continue
+
+            with profilePhase("dispatch"):
+                slot = min(
+                    set(range(0, number_of_threads_stats)) - set(threadslots))
+                thread = threading.Thread(target=catchingThread,
+                                          args=(
+                                              errors,
+                                              gatherThread,
+                                              threadid,
+                                              setstotal,
+                                              counter_queue,
+                                              counter_queue_lock,
+                                              starttime,
+                                              emulator,
+                                              tasksetsize,
+                                              tasksetfiles,
+                                              gatherqueue,
+                                              slot,
+                                          ))
+                thread.start()
+                threads.append(thread)
+                threadslots.append(slot)
+                threadid += 1
+
+    # here we wait for all threads to end, sizes are finalized meanwhile
     while len(threads) > 0:
         for i in range(0, len(threads)):
             if threads[i].is_alive() == False:
                 threads[i].join()
                 threads.pop(i)
+                threadslots.pop(i)
                 break
+        if len(errors) == 0:
+            collectGathered(gatherqueue, manifest, finished)
         time.sleep(0.01)
-
-    # move data from queue to full data dict
-    while (gatherqueue.qsize() > 0):
-        queueitem = gatherqueue.get()
-        fulldata[queueitem["emulator"]][str(
-            queueitem["tasksetsize"])] = queueitem["data"]
-
-    # now we write final data to resultfiles - per taskset
-    for tasksetsize_item in os.walk("tasksets"):
-        tasksetpath = tasksetsize_item[0]
-        if (tasksetpath != "tasksets"):
-            tasksetsize = tasksetpath.split("/")[1]
-            tasksetstats_text_full = taskset_per_size_stats_full
-            tasksetstats_text = taskset_per_size_stats
-
-            for i in range(
-                    0,
-                    len(fulldata[str(
-                        emulators[0][0])][str(tasksetsize)]['sizes'])):
-                first_emulator = True
-                for emulatorclass in emulators:
-                    for emulator in emulatorclass:
-                        if first_emulator == True:
-                            first_emulator = False
-                            if stats_per_size_csv_full == True \
-                                or stats_per_size_dat_full == True:
-                                tasksetstats_text_full += str(
-                                    fulldata[str(emulator)][str(
-                                        tasksetsize)]['sizes'][i][0]) + ";"
-                                tasksetstats_text_full += str(
-                                    fulldata[str(emulator)][str(
-                                        tasksetsize)]['ids'][i][0]) + ";"
-                            if stats_per_size_csv == True \
-                                or stats_per_size_dat == True:
-                                tasksetstats_text += str(
-                                    fulldata[str(emulator)][str(
-                                        tasksetsize)]['sizes'][i][0]) + ";"
-                                tasksetstats_text += str(
-                                    fulldata[str(emulator)][str(
-                                        tasksetsize)]['ids'][i][0]) + ";"
-
-                        if stats_per_size_csv_full == True \
-                            or stats_per_size_dat_full == True:
-                            tasksetstats_text_full += str(
-                                round(
-                                    geometric_mean(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'][i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    min(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'][i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    max(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'][i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'][i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'][i]) /
-                                    len(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'][i]))) + ";"
-
-                            tasksetstats_text_full += str(
-                                round(
-                                    geometric_mean(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'][i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    min(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'][i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    max(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'][i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'][i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'][i]) /
-                                    len(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'][i]))) + ";"
-
-                            tasksetstats_text_full += str(
-                                round(
-                                    geometric_mean(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean']
-                                                   [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    min(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean']
-                                        [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    max(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean']
-                                        [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean']
-                                          [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'][i]
-                                          ) / len(fulldata[str(emulator)][str(
-                                              tasksetsize
-                                          )]['time_perinsert_mean'][i]))) + ";"
-
-                            tasksetstats_text_full += str(
-                                round(
-                                    geometric_mean(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min']
-                                                   [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    min(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min']
-                                        [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    max(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min']
-                                        [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min']
-                                          [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'][i])
-                                    / len(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'][i])
-                                )) + ";"
-
-                            tasksetstats_text_full += str(
-                                round(
-                                    geometric_mean(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max']
-                                                   [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    min(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max']
-                                        [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    max(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max']
-                                        [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max']
-                                          [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'][i])
-                                    / len(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'][i])
-                                )) + ";"
-
-                            tasksetstats_text_full += str(
-                                round(
-                                    geometric_mean(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']
-                                                   [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    min(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']
-                                        [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    max(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']
-                                        [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']
-                                          [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']
-                                          [i]) /
-                                    len(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']
-                                        [i]))) + ";"
-
-                            tasksetstats_text_full += str(
-                                round(
-                                    geometric_mean(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err']
-                                                   [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    min(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err']
-                                        [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    max(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err']
-                                        [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err']
-                                          [i]))) + ";"
-                            tasksetstats_text_full += str(
-                                round(
-                                    stdev(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'][i])
-                                    / len(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'][i])
-                                )) + ";"
-
-                        if stats_per_size_csv == True \
-                            or stats_per_size_dat == True:
-                            tasksetstats_text += str(
-                                round(
-                                    geometric_mean(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'][i]))) + ";"
-                            tasksetstats_text += str(
-                                round(
-                                    geometric_mean(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'][i]))) + ";"
-                            tasksetstats_text += str(
-                                round(
-                                    geometric_mean(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean']
-                                                   [i]))) + ";"
-                            tasksetstats_text += str(
-                                round(
-                                    geometric_mean(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']
-                                                   [i]))) + ";"
-
-                if stats_per_size_csv_full == True \
-                    or stats_per_size_dat_full == True:
-                    tasksetstats_text_full = tasksetstats_text_full[:-1] + "\n"
-
-                if stats_per_size_csv == True or stats_per_size_dat == True:
-                    tasksetstats_text = tasksetstats_text[:-1] + "\n"
-
-            # append means per taskset-size
-            first_emulator = True
-            for emulatorclass in emulators:
-                for emulator in emulatorclass:
-                    if first_emulator == True:
-                        first_emulator = False
-                        if stats_per_size_csv_full == True \
-                            or stats_per_size_dat_full == True:
-                            tasksetstats_text_full += str(
-                                fulldata[str(emulator)][str(
-                                    tasksetsize)]['sizes'][i][0]) + ";"
-                            tasksetstats_text_full += "mean" + ";"
-                        if stats_per_size_csv == True \
-                            or stats_per_size_dat == True:
-                            tasksetstats_text += str(fulldata[str(emulator)][
-                                str(tasksetsize)]['sizes'][i][0]) + ";"
-                            tasksetstats_text += "mean" + ";"
-
-                        if stats_per_size_csv_full == True \
-                            or stats_per_size_dat_full == True:
-                            taskset_overall_stats_full += str(
-                                fulldata[str(emulator)][str(
-                                    tasksetsize)]['sizes'][i][0]) + ";"
-                            taskset_overall_stats_full += str(
-                                len(fulldata[str(emulators[0][0])][str(
-                                    tasksetsize)]['sizes'])) + ";"
-
-                        if stats_per_size_csv == True \
-                            or stats_per_size_dat == True:
-                            taskset_overall_stats += str(
-                                fulldata[str(emulator)][str(
-                                    tasksetsize)]['sizes'][i][0]) + ";"
-                            taskset_overall_stats += str(
-                                len(fulldata[str(emulators[0][0])][str(
-                                    tasksetsize)]['sizes'])) + ";"
-
-                    if stats_per_size_csv_full == True \
-                        or stats_per_size_dat_full == True:
-                        tasksetstats_text_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])) /
-                                len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-
-                        tasksetstats_text_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])) /
-                                len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-
-                        tasksetstats_text_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean']))
-                                / len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-
-                        tasksetstats_text_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])) /
-                                len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])))
-                        ) + ";"
-
-                        tasksetstats_text_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])) /
-                                len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])))
-                        ) + ";"
-
-                        tasksetstats_text_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                                / len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-
-                        tasksetstats_text_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])))
-                        ) + ";"
-                        tasksetstats_text_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])) /
-                                len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])))
-                        ) + ";"
-
-                    if stats_per_size_csv == True or stats_per_size_dat == True:
-                        tasksetstats_text += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-                        tasksetstats_text += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-                        tasksetstats_text += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-                        tasksetstats_text += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-
-                    if stats_overall_csv_full == True \
-                        or stats_overall_dat_full == True:
-                        taskset_overall_stats_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])) /
-                                len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-
-                        taskset_overall_stats_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])) /
-                                len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-
-                        taskset_overall_stats_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean']))
-                                / len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-
-                        taskset_overall_stats_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])) /
-                                len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_min'])))
-                        ) + ";"
-
-                        taskset_overall_stats_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])) /
-                                len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_max'])))
-                        ) + ";"
-
-                        taskset_overall_stats_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                                / len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-
-                        taskset_overall_stats_full += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                min(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                max(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])))
-                        ) + ";"
-                        taskset_overall_stats_full += str(
-                            round(
-                                stdev(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])) /
-                                len(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_err'])))
-                        ) + ";"
-
-                    if stats_overall_csv == True or stats_overall_dat == True:
-                        taskset_overall_stats += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['inserts'])))) + ";"
-                        taskset_overall_stats += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_total'])))) + ";"
-                        taskset_overall_stats += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_mean'])))
-                        ) + ";"
-                        taskset_overall_stats += str(
-                            round(
-                                geometric_mean(
-                                    mergeSublists(fulldata[str(emulator)][str(
-                                        tasksetsize)]['time_perinsert_stdev']))
-                            )) + ";"
-
-            if stats_per_size_csv_full == True \
-                or stats_per_size_dat_full == True:
-                tasksetstats_text_full = tasksetstats_text_full[:-1] + "\n"
-                if stats_per_size_csv_full == True:
-                    with open("./log/" + tasksetsize + "-full.csv",
-                              "w") as taskset_stats_full:
-                        taskset_stats_full.write(tasksetstats_text_full)
-                if stats_per_size_dat_full == True:
-                    with open("./log/" + tasksetsize + "-full.dat",
-                              "w") as taskset_stats_full:
-                        taskset_stats_full.write(
-                            tasksetstats_text_full.replace(";", " "))
-
-            if stats_per_size_csv == True or stats_per_size_dat == True:
-                tasksetstats_text = tasksetstats_text[:-1] + "\n"
-                if stats_per_size_csv == True:
-                    with open("./log/" + tasksetsize + ".csv",
-                              "w") as taskset_stats:
-                        taskset_stats.write(tasksetstats_text)
-                if stats_per_size_dat == True:
-                    with open("./log/" + tasksetsize + ".dat",
-                              "w") as taskset_stats:
-                        taskset_stats.write(tasksetstats_text.replace(
-                            ";", " "))
-
-            if stats_overall_csv_full == True or stats_overall_dat_full == True:
-                taskset_overall_stats_full = \
-                    taskset_overall_stats_full[:-1] + "\n"
-
-            if stats_overall_csv == True or stats_overall_dat == True:
-                taskset_overall_stats = taskset_overall_stats[:-1] + "\n"
+    parseStop()
+    if len(errors) > 0:
+        raise errors[0]
+    collectGathered(gatherqueue, manifest, finished)
 
     # now we write final data to resultfiles - overall
-    if stats_overall_csv_full == True or stats_overall_dat_full == True:
+    taskset_overall_stats_full = [
+        ";".join(["size", "sets"] + statsHeader(True))
+    ] + [
+        finished["overall_full"][size]
+        for size in sorted(finished["overall_full"])
+    ]
+    taskset_overall_stats = [
+        ";".join(["size", "sets"] + statsHeader(False))
+    ] + [finished["overall"][size] for size in sorted(finished["overall"])]
+    with profilePhase("output"):
         if stats_overall_csv_full == True:
-            with open("./log/summary-full.csv", "w") as perffile:
-                perffile.write(taskset_overall_stats_full)
+            writeStatistics("./log/summary-full.csv",
+                            taskset_overall_stats_full, ";")
         if stats_overall_dat_full == True:
-            with open("./log/summary-full.dat", "w") as perffile:
-                perffile.write(taskset_overall_stats_full.replace(";", " "))
-
-    if stats_overall_csv == True or stats_overall_dat == True:
+            writeStatistics("./log/summary-full.dat",
+                            taskset_overall_stats_full, " ")
         if stats_overall_csv == True:
-            with open("./log/summary.csv", "w") as perffile:
-                perffile.write(taskset_overall_stats)
+            writeStatistics("./log/summary.csv", taskset_overall_stats, ";")
         if stats_overall_dat == True:
-            with open("./log/summary.dat", "w") as perffile:
-                perffile.write(taskset_overall_stats.replace(";", " "))
+            writeStatistics("./log/summary.dat", taskset_overall_stats, " ")
+        writeMatrix()
+        writeErrorReport(finished["missing"], runstotal)
+        if stats_group_by != "":
+            group_stats = [
+                ";".join(["size", "group", "lower", "upper", "sets"] +
+                         statsHeader(False))
+            ]
+            for size in sorted(finished["groups"]):
+                group_stats += finished["groups"][size]
+            writeStatistics("./log/groups-" + stats_group_by + ".csv",
+                            group_stats, ";")
+            writeStatistics("./log/groups-" + stats_group_by + ".dat",
+                            group_stats, " ")
+
+    summarydata = finished["summary"]
+    scalingresults = None
+    if stats_scaling == True:
+        with profilePhase("aggregation"):
+            print("")
+            # sizes without any run of an emulator are not fitted
+            scalingdata = {}
+            for emulator in emulatorList():
+                scalingdata[emulator] = [
+                    (size, values["time_perinsert_mean"])
+                    for size, values in sorted(summarydata[emulator].items())
+                    if math.isnan(values["time_perinsert_mean"]) == False
+                ]
+            scalingresults = scalingAnalysis(scalingdata)
+
+    pairedresults = None
+    if stats_paired == True:
+        pairedresults = pairedAnalysis(manifest)
+
+    historyid = None
+    if stats_history == True:
+        with profilePhase("output"):
+            historyid = historyStore(finished["tasksets"], summarydata)
+
+    profileWrite("stats",
+                 time.perf_counter() - statsstarttime, number_of_threads_stats)
+
+    return {
+        "data": finished["data"],
+        "summary": summarydata,
+        "scaling": scalingresults,
+        "paired": pairedresults,
+        "history": historyid,
+        "missing": finished["missing"]
+    }
 
 
 # help text
@@ -1398,17 +4174,114 @@ def printHelp():
     print()
     print("usage: emulate.py run     Runs emulations")
     print("       emulate.py stats   Gather statistics from emulation logs")
+    print("       emulate.py stats --preview")
+    print("                          Approximate statistics from a sample " +
+          "of the logs")
+    print("       emulate.py calibrate")
+    print("                          Find number of emulation threads " +
+          "without timing shift")
+    print("       emulate.py archive Move logfiles into archives")
+    print("       emulate.py extract Restore logfiles from archives")
+    print("       emulate.py plan <seconds>")
+    print("                          Plan tasksets and runs per size " +
+          "within time budget")
+    print("       emulate.py compare [baseline [current]]")
+    print("                          Compare stats runs of history, exits " +
+          "with 2 on regression")
     print()
 
 
-### execution
-if len(sys.argv) > 1 and sys.argv[1] == "run":
-    runEmulations()
-    sys.exit(0)
+# run emulations with given configuration, returns results per job
+def run(config=None):
+    with useConfiguration(config):
+        return runEmulations()
+
+
+# gather statistics with given configuration, returns means per emulator and
+# taskset size and data per run if kept
+def stats(config=None):
+    with useConfiguration(config):
+        return gatherStatistics()
+
+
+# calibrate with given configuration, returns calibration
+def calibrate(config=None):
+    with useConfiguration(config):
+        return calibrateEmulation()
+
+
+# move logfiles into archives with given configuration
+def archive(config=None):
+    with useConfiguration(config):
+        return archiveLogs()
+
+
+# restore logfiles from archives with given configuration
+def extract(config=None):
+    with useConfiguration(config):
+        return extractLogs()
 
-if len(sys.argv) > 1 and sys.argv[1] == "stats":
-    gatherStatistics()
-    sys.exit(0)
 
-printHelp()
-sys.exit(1)
+# approximate statistics from a sample of the logs with given configuration
+def preview(config=None):
+    with useConfiguration(config):
+        return previewStatistics()
+
+
+# plan tasksets and runs within time budget with given configuration
+def plan(budget, config=None):
+    with useConfiguration(config):
+        return planRuns(budget)
+
+
+# compare stats runs of history with given configuration
+def compare(baseline=None, current=None, config=None):
+    with useConfiguration(config):
+        return compareHistory(baseline, current)
+
+
+# command line interface
+def main(argv):
+    commands = {
+        "run": run,
+        "stats": stats,
+        "calibrate": calibrate,
+        "archive": archive,
+        "extract": extract,
+        "compare": compare,
+        "plan": plan
+    }
+    if len(argv) < 2 or argv[1] not in commands:
+        printHelp()
+        return 1
+
+    try:
+        if argv[1] == "compare":
+            try:
+                historyids = [int(historyid) for historyid in argv[2:4]]
+            except ValueError:
+                raise EmulationError("Error parsing run ids " +
+                                     " ".join(argv[2:4]))
+            comparison = compare(*historyids)
+            if len(comparison["regressions"]) > 0:
+                return 2
+        elif argv[1] == "plan":
+            try:
+                budget = float(argv[2])
+            except:
+                raise EmulationError("Error parsing time budget in seconds")
+            plan(budget)
+        elif argv[1] == "stats" and "--preview" in argv[2:]:
+            preview()
+        else:
+            commands[argv[1]]()
+    except EmulationError as error:
+        print(str(error) + ", exiting.")
+        return 1
+
+    return 0
+
+
+### execution
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))